@@ -0,0 +1,65 @@
+// Anagram index over the word list.
+//
+// Every word is filed under its signature, its letters in sorted order, so all the dictionary anagrams of a
+// scramble are one Map lookup away. The index decides which guesses count as solving a round (any dictionary
+// anagram of the solution, not only the solution itself) and which words are ambiguous (more than one dictionary
+// word for the same letters). Signatures and lookups ignore case.
+// frontend/anagram_index.py mirrors this module.
+
+// function to return the anagram signature of a word: its lowercased letters in sorted order
+function signature(word) {
+    return word.toLowerCase().split('').sort().join('');
+}
+
+
+class AnagramIndex {
+    constructor(words = []) {
+        this.groups = new Map();
+        this.words = new Set();
+        words.forEach((word) => this.add(word));
+    }
+
+    static fromBuckets(buckets) {
+        const index = new AnagramIndex();
+        buckets.forEach((words) => words.forEach((word) => index.add(word)));
+        return index;
+    }
+
+    add(word) {
+        const key = word.toLowerCase();
+        if (this.words.has(key)) {
+            return;
+        }
+        this.words.add(key);
+        const sig = signature(key);
+        if (!this.groups.has(sig)) {
+            this.groups.set(sig, []);
+        }
+        this.groups.get(sig).push(key);
+    }
+
+    isWord(word) {
+        return this.words.has(word.toLowerCase());
+    }
+
+    // returns the dictionary words made of exactly the given letters (the solutions of a scramble)
+    anagrams(letters) {
+        return this.groups.get(signature(letters)) || [];
+    }
+
+    // a word is ambiguous if its letters also spell another dictionary word
+    isAmbiguous(word) {
+        return this.anagrams(word).length > 1;
+    }
+
+    // true if the guess solves a round whose word is solution: the solution itself or another dictionary anagram of it
+    accepts(guess, solution) {
+        if (guess === solution) {
+            return true;
+        }
+        return guess.length === solution.length && signature(guess) === signature(solution) && this.isWord(guess);
+    }
+}
+
+
+module.exports = { AnagramIndex, signature };
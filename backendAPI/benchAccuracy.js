@@ -0,0 +1,54 @@
+// Benchmark for the accuracy stats: records rounds through recordAccuracy's running stats and reports the mean cost
+// per call for each slice of rounds, so a cost that grows with the number of rounds played shows up as rising
+// numbers. The old push-and-re-sum approach is timed over fewer rounds for comparison.
+//
+// Usage:
+//     node benchAccuracy.js [rounds=1000000] [slices=10]
+
+const { RunningStats } = require('./runningStats');
+
+const rounds = parseInt(process.argv[2], 10) || 1000000;
+const slices = parseInt(process.argv[3], 10) || 10;
+const legacyRounds = Math.min(rounds, 50000);
+
+// the previous recordAccuracy: push the round accuracy and re-sum every round played so far
+function legacyRecord(percents, ra) {
+    percents.push(ra);
+    let sum = 0;
+    for (let i = 0; i < percents.length; i++) {
+        sum += percents[i];
+    }
+    return sum / percents.length;
+}
+
+// function to time `count` calls of record(i) per slice and return the mean cost per call in ns for each slice
+function timeSlices(count, record) {
+    const sliceSize = Math.ceil(count / slices);
+    const costs = [];
+    for (let start = 0; start < count; start += sliceSize) {
+        const end = Math.min(count, start + sliceSize);
+        const started = process.hrtime.bigint();
+        for (let i = start; i < end; i++) {
+            record(i);
+        }
+        costs.push(Number(process.hrtime.bigint() - started) / (end - start));
+    }
+    return costs;
+}
+
+const accuracy = (i) => 100 / (1 + (i * 7919) % 9);
+
+const stats = new RunningStats(10);
+let costs = timeSlices(rounds, (i) => stats.add(accuracy(i)));
+console.log(`running stats: ${rounds} rounds, ns per call by slice: ${costs.map((cost) => cost.toFixed(0)).join(' ')}`);
+console.log(`  first slice ${costs[0].toFixed(0)} ns, last slice ${costs[costs.length - 1].toFixed(0)} ns`);
+let started = process.hrtime.bigint();
+for (let i = 0; i < 1000; i++) {
+    stats.toJSON();
+}
+console.log(`  stats read: ${(Number(process.hrtime.bigint() - started) / 1000).toFixed(0)} ns, ` +
+    `mean ${stats.mean.toFixed(3)}%, stddev ${stats.stddev.toFixed(3)}%`);
+
+const percents = [];
+costs = timeSlices(legacyRounds, (i) => legacyRecord(percents, accuracy(i)));
+console.log(`legacy re-sum: ${legacyRounds} rounds, ns per call by slice: ${costs.map((cost) => cost.toFixed(0)).join(' ')}`);
@@ -0,0 +1,67 @@
+// Benchmark for the leaderboard store: submits random scores to a scratch log and reports throughput,
+// per-submission latency and compactions. The old read/sort/rewrite-per-score approach is timed for comparison.
+//
+// Usage:
+//     node benchLeaderboard.js [submissions=100000] [topN=10]
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { LeaderboardStore } = require('./leaderboardStore');
+
+const submissions = parseInt(process.argv[2], 10) || 100000;
+const topN = parseInt(process.argv[3], 10) || 10;
+const legacySubmissions = Math.min(submissions, 10000);
+
+// function to return the p-th percentile of a sorted array
+function percentile(sorted, p) {
+    return sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p / 100))];
+}
+
+// the previous updateLeaderboard: re-read, re-parse, sort and rewrite the whole file for every score
+function legacyUpdate(filename, username, newScore) {
+    const highScores = fs.readFileSync(filename, 'utf-8').split('\n')
+        .map(line => line.trim())
+        .filter(line => line.length > 0)
+        .map(line => {
+            const [name, score] = line.split(', ');
+            return { name, score: parseInt(score) };
+        });
+    highScores.push({ name: username, score: newScore });
+    highScores.sort((a, b) => b.score - a.score);
+    fs.writeFileSync(filename, highScores.slice(0, topN).map(entry => `${entry.name}, ${entry.score}`).join('\n'));
+}
+
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'leaderboard-bench-'));
+try {
+    const store = new LeaderboardStore(path.join(dir, 'leaderboard.txt'), { topN });
+    const latencies = new Float64Array(submissions);
+    let started = process.hrtime.bigint();
+    for (let i = 0; i < submissions; i++) {
+        const t = process.hrtime.bigint();
+        store.submit(`player${i % 997}`, Math.floor(Math.random() * 1000));
+        latencies[i] = Number(process.hrtime.bigint() - t) / 1000;
+    }
+    let seconds = Number(process.hrtime.bigint() - started) / 1e9;
+    const sorted = Array.from(latencies).sort((a, b) => a - b);
+    console.log(`store: ${submissions} submissions in ${seconds.toFixed(2)} s (${Math.round(submissions / seconds)}/s), ` +
+        `compactions: ${store.stats.compactions}`);
+    console.log(`  latency us: p50 ${percentile(sorted, 50).toFixed(1)}, p95 ${percentile(sorted, 95).toFixed(1)}, ` +
+        `p99 ${percentile(sorted, 99).toFixed(1)}`);
+    started = process.hrtime.bigint();
+    for (let i = 0; i < 1000; i++) {
+        store.text();
+    }
+    console.log(`  read: ${(Number(process.hrtime.bigint() - started) / 1000 / 1000).toFixed(1)} us per leaderboard read`);
+
+    const legacyFile = path.join(dir, 'legacy.txt');
+    fs.writeFileSync(legacyFile, '');
+    started = process.hrtime.bigint();
+    for (let i = 0; i < legacySubmissions; i++) {
+        legacyUpdate(legacyFile, `player${i % 997}`, Math.floor(Math.random() * 1000));
+    }
+    seconds = Number(process.hrtime.bigint() - started) / 1e9;
+    console.log(`legacy rewrite: ${legacySubmissions} submissions in ${seconds.toFixed(2)} s (${Math.round(legacySubmissions / seconds)}/s)`);
+} finally {
+    fs.rmSync(dir, { recursive: true, force: true });
+}
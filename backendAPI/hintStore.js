@@ -0,0 +1,40 @@
+// Local dictionary store for the speech type (hint 1) and definition (hint 3) hints.
+//
+// hints.tsv has one "word<TAB>part of speech<TAB>definition" line per word in words.txt (built by
+// frontend/build_hints.py from an offline dictionary dump). It is loaded lazily on the first hint request. Whether the
+// file exists is checked once when the store is created, a store built later is picked up on the next restart.
+
+const fs = require('fs');
+
+class HintStore {
+    constructor(filePath) {
+        this.filePath = filePath;
+        this.entries = null;
+        this.exists = fs.existsSync(filePath);
+    }
+
+    available() {
+        return this.exists;
+    }
+
+    load() {
+        this.entries = new Map();
+        fs.readFileSync(this.filePath, 'utf8').split('\n').forEach((line) => {
+            const [word, partOfSpeech, definition] = line.split('\t');
+            if (word && (partOfSpeech || definition)) {
+                this.entries.set(word, { partOfSpeech, definition });
+            }
+        });
+    }
+
+    // returns {partOfSpeech, definition} for a word, or null if the store has no hints for it
+    lookup(word) {
+        if (this.entries === null) {
+            this.load();
+        }
+        return this.entries.get(word.toLowerCase()) || null;
+    }
+}
+
+
+module.exports = { HintStore };
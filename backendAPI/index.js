@@ -30,6 +30,7 @@ app.use(bodyParser.urlencoded({ extended: true }));
 app.use(bodyParser.json());
 const fs = require('fs');
 const axios = require('axios');
+const crypto = require('crypto');
 const {response} = require("express");
 
 // file path for dependencies (words.txt for word selection & leaderboard.txt for leaderboard scores)
@@ -37,13 +38,60 @@ const path = require('path');
 const filePath = path.join(__dirname, 'words.txt');
 const leaderboardFilename = path.join(__dirname, 'leaderboard.txt');
 
+// leaderboard.txt is an append-only score log, the top scores are kept in memory
+const { LeaderboardStore } = require('./leaderboardStore');
+const leaderboard = new LeaderboardStore(leaderboardFilename, { topN: parseInt(process.env.LEADERBOARD_TOP_N, 10) || 10 });
 
-let currentWord = '';
-let scramble = '';
-let round = 0;
-let complete = 0;
-let round_accuracy_percents = [];
+// every finished round is appended to rounds.jsonl, running totals over all rounds are kept in memory
+const { RoundHistory } = require('./roundHistory');
+const roundHistory = new RoundHistory(process.env.ROUNDS_LOG || path.join(__dirname, 'rounds.jsonl'));
 
+// words.txt is loaded once into length buckets and reloaded when the file changes
+// word_stats.tsv (built with frontend/build_word_stats.py) rates each word's difficulty for the difficulty parameter
+const { WordIndex } = require('./wordIndex');
+const { parseDifficulty } = require('./wordStats');
+const wordIndex = new WordIndex(filePath, 2000, { statsPath: path.join(__dirname, 'word_stats.tsv') }).watch();
+
+// hints come from the local hint store, the live dictionary API is only used when hints.tsv has not been built
+const { HintStore } = require('./hintStore');
+const hintStore = new HintStore(path.join(__dirname, 'hints.tsv'));
+const dictionaryCache = new Map();
+
+// game state is kept per session (X-Session-Id header), requests without a session id share the default session
+const { SessionStore, newGameState } = require('./sessionStore');
+const sessions = new SessionStore(
+    parseInt(process.env.MAX_SESSIONS, 10) || 10000,
+    (parseInt(process.env.SESSION_TTL_SECONDS, 10) || 30 * 60) * 1000).startSweeper();
+const defaultSession = newGameState();
+
+// prefetched words kept per session (oldest evicted first)
+const maxPendingRounds = 16;
+
+// most guesses accepted by one /check-words request
+const maxBatchGuesses = 1000;
+
+// scoring rules are shared with the Python client (scoring.json), the server's score is the one that counts
+const { calculateScore } = require('./scoring');
+// rounds finished with a client score prediction, and how many predictions did not match the server's score
+const scoreChecks = { predicted: 0, mismatched: 0 };
+
+
+
+// attaches the caller's game state to the request
+app.use((req, res, next) => {
+    const id = req.get('X-Session-Id');
+    if (!id) {
+        req.game = defaultSession;
+        next();
+        return;
+    }
+    req.game = sessions.get(id);
+    if (req.game === null && req.path !== '/session' && req.path !== '/') {
+        res.status(404).json({ error: 'Unknown or expired session.' });
+        return;
+    }
+    next();
+});
 
 
 // get home request to display api title (not necessary for game)
@@ -52,25 +100,40 @@ app.get('/', (req, res) => {
 });
 
 
-// initializes game variables
+// starts a new session with fresh game variables and returns its id
 app.get('/session', (req, res) => {
-    res.send("Operational") ;
-    round = 0;
-    complete = 0;
-    round_accuracy_percents = []
+    res.json({ status: "Operational", session: sessions.create() });
 });
 
 // post request that will be sent from frontend to check if a word is in the correct position,
 // also returns both the position data, and the similarity % for our guess and solution
+// Any dictionary anagram of the word solves the round ("post" for "stop"), it then becomes the round's solution.
+// Guesses are only taken while a round is running (409 before the first round and once it is finished)
 app.post('/check-word', (req, res) => {
-    const inputWord = req.body.word;
-    const solution = currentWord
+    const game = req.game;
+    const inputWord = String(req.body.word || '');
+    if (inputWord.length === 0) {
+        res.status(400).json({ error: 'Invalid request data.' });
+        return;
+    }
+    if (game.finished) {
+        res.status(409).json({ error: 'No round is running.' });
+        return;
+    }
+    if (wordIndex.anagrams.accepts(inputWord, game.currentWord)) {
+        game.currentWord = inputWord;
+    }
+    const solution = game.currentWord
     const word_score = checkScrambledWord(inputWord, solution)
 
     if (inputWord === solution) {
         res.json({ result: 'correct',
                 score: word_score});
-        complete++;
+        if (!game.solved) {
+            game.complete++;
+            game.solved = true;
+            game.solvedAt = Date.now();
+        }
     } else {
         res.json({ result: 'incorrect',
             score: word_score});
@@ -78,57 +141,192 @@ app.post('/check-word', (req, res) => {
 });
 
 
-// post request that will be sent from frontend to get a word. Takes the requested word letter length as a parameter and responds with the word from the herokuapp API
+// post request for automated players to check many guesses at once. Takes a JSON array of words and responds with
+// {correct, results}: correct is the index of the first correct guess (-1 if none), results holds one
+// [position code, similarity %] pair per guess, null for a guess with the wrong number of letters
+app.post('/check-words', (req, res) => {
+    const game = req.game;
+    const words = req.body.words;
+    if (!Array.isArray(words) || !words.every((word) => typeof word === 'string' && word.length > 0)) {
+        return res.status(400).json({ error: 'words must be an array of non-empty strings.' });
+    }
+    if (words.length > maxBatchGuesses) {
+        return res.status(413).json({ error: `At most ${maxBatchGuesses} words per request.` });
+    }
+    if (game.finished) {
+        return res.status(409).json({ error: 'No round is running.' });
+    }
+    const correct = words.findIndex((word) => wordIndex.anagrams.accepts(word, game.currentWord));
+    if (correct !== -1) {
+        game.currentWord = words[correct];
+    }
+    const solution = game.currentWord;
+    if (correct !== -1 && !game.solved) {
+        game.complete++;
+        game.solved = true;
+        game.solvedAt = Date.now();
+    }
+    res.json({ correct, results: words.map((word) => scoreGuess(word, solution)) });
+});
+
+
+// post request that will be sent from frontend to get a word. Takes the requested word letter length as a parameter and responds with the scrambled word.
+// A token from /prefetch-word starts the prefetched word instead of picking a new one. An optional difficulty
+// (easy, medium, hard or a number from 0 to 1) picks a word rated near that difficulty
 app.post('/get-word', async (req, res) =>
 {
+    const game = req.game;
+    const token = req.body.token;
+    // the round clock starts when the scramble is first sent, for a prefetched word that is the /prefetch-word response
+    let roundStarted = Date.now();
+    if (token && game.pendingRounds.has(token)) {
+        const pending = game.pendingRounds.get(token);
+        game.pendingRounds.delete(token);
+        game.currentWord = pending.word;
+        game.scramble = pending.scramble;
+        roundStarted = pending.sentAt;
+    } else {
+        const inputData = parseInt(req.body.letters, 10);
+        let difficulty;
+        try {
+            difficulty = parseDifficulty(req.body.difficulty);
+        } catch (error) {
+            res.status(400).json({ error: error.message });
+            return;
+        }
+        const target = wordIndex.randomWord(inputData, difficulty);
+        if (target === null) {
+            res.status(404).json({ error: 'No words with that many letters.' });
+            return;
+        }
+
+        game.currentWord = '' + target
+        game.scramble = scrambleWord(game.currentWord)
+    }
+    game.solved = false;
+    game.round++;
+    game.roundStarted = roundStarted;
+    game.solvedAt = 0;
+    game.hintsUsed = new Set();
+    game.finished = false;
+    game.unclaimedScore = null;
+    res.json({word: game.scramble});
+});
+
+
+// post request used by the frontend to fetch the next round's word while the current round is played. The round only
+// starts when the returned token is sent to /get-word, but its clock runs from now: the client can see the scramble.
+// Hints are not sent, /hint-N has to be asked so the server counts them. Takes the same letters and difficulty as /get-word
+app.post('/prefetch-word', (req, res) => {
+    const game = req.game;
     const inputData = parseInt(req.body.letters, 10);
-    const words = readTextFile(filePath, inputData);
-    const target = getRandomWord(words)
+    let difficulty;
+    try {
+        difficulty = parseDifficulty(req.body.difficulty);
+    } catch (error) {
+        res.status(400).json({ error: error.message });
+        return;
+    }
+    const target = wordIndex.randomWord(inputData, difficulty);
+    if (target === null) {
+        res.status(404).json({ error: 'No words with that many letters.' });
+        return;
+    }
 
-    currentWord = '' + target
-    scramble = scrambleWord(currentWord)
-    round++;
-    res.json({word: scramble});
+    const word = '' + target;
+    const pending = { word: word, scramble: scrambleWord(word), sentAt: Date.now() };
+    const token = crypto.randomUUID();
+    game.pendingRounds.set(token, pending);
+    if (game.pendingRounds.size > maxPendingRounds) {
+        game.pendingRounds.delete(game.pendingRounds.keys().next().value);
+    }
+    res.json({ token: token, word: pending.scramble });
 });
 
 
 // returns the accuracy % calculations
 app.post('/accuracy', (req, res) => {
-    const guess_attempts = req.body.guess_attempts;
-    const cp = (complete/round)*100;
-    const ra = (1/guess_attempts)*100;
+    const game = req.game;
+    const attempts = parseInt(req.body.guess_attempts, 10);
+    if (!Number.isInteger(attempts) || attempts < 1) {
+        res.status(400).json({ error: 'Invalid request data.' });
+        return;
+    }
+    res.json(recordAccuracy(game, attempts));
+});
 
-    round_accuracy_percents.push(ra)
-    let sum = 0;
-    for (let i = 0; i < round_accuracy_percents.length; i++) {
-        sum += round_accuracy_percents[i];
+
+// post request sent by the frontend when a round ends. Takes the guess count and username, plus the client's elapsed
+// time (seconds) and hints used as its score prediction.
+// The score is computed from the server's own round clock (from /get-word to the first correct guess) and the hint
+// requests it served, the client's values are only compared against it. Records the round accuracy, updates the
+// leaderboard if the word was solved, appends the round to the round history and responds with the solution, the
+// accuracy stats, the score and the updated leaderboard in one response
+app.post('/finish-round', (req, res) => {
+    const game = req.game;
+    const { username, guess_attempts, elapsed, hints } = req.body;
+    const attempts = parseInt(guess_attempts, 10);
+    if (!Number.isInteger(attempts) || attempts < 1 || (elapsed !== undefined && !Number.isFinite(Number(elapsed))) ||
+        (hints !== undefined && !Array.isArray(hints))) {
+        res.status(400).json({ error: 'Invalid request data.' });
+        return;
+    }
+    if (game.finished) {
+        res.status(409).json({ error: 'The round is already finished.' });
+        return;
     }
 
-    const ga = sum / round_accuracy_percents.length;
+    game.finished = true;
+    const accuracy = recordAccuracy(game, attempts);
+    const seconds = ((game.solved ? game.solvedAt : Date.now()) - game.roundStarted) / 1000;
+    const hintsUsed = Array.from(game.hintsUsed).sort();
+    let score = 0;
+    if (game.solved) {
+        score = calculateScore(game.currentWord.length, seconds, hintsUsed);
+        game.unclaimedScore = score;
+        if (username) {
+            updateLeaderboard(username, score);
+            game.unclaimedScore = null;
+        }
+        if (elapsed !== undefined) {
+            scoreChecks.predicted++;
+            if (calculateScore(game.currentWord.length, Number(elapsed), hints || []) !== score) {
+                scoreChecks.mismatched++;
+            }
+        }
+    }
+    try {
+        roundHistory.record({ user: username, word: game.currentWord, solved: game.solved, guesses: attempts,
+            elapsed: seconds, hints: hintsUsed, score });
+    } catch (error) {
+        console.error('Error recording the round:', error);
+    }
 
-    res.json({ completion: cp,
-        round_accuracy: ra,
-    game_accuracy: ga});
+    res.json({ solution: game.currentWord,
+        complete: game.solved,
+        score: score,
+        ...accuracy,
+        leaderboard: leaderboard.text() });
+});
+
+
+// returns totals over every round in the round history (rounds, solve rate, mean guesses, time and score, hints used)
+// and how often client score predictions disagreed with the server since it started
+app.get('/round-stats', (req, res) => {
+    res.json({ ...roundHistory.summary(), score_checks: { ...scoreChecks } });
 });
 
 
 // returns the speech type of the solution (hint 1 button)
 app.get('/hint-1', async (req, res) => {
+    const game = req.game;
+    game.hintsUsed.add(1);
     try {
-        const apiUrl = `https://api.dictionaryapi.dev/api/v2/entries/en/${currentWord}`;
-        const response = await axios.get(apiUrl);
-
-        if (Array.isArray(response.data) && response.data.length > 0) {
-            const meanings = response.data[0].meanings;
-
-            if (meanings && Array.isArray(meanings) && meanings.length > 0) {
-                const partOfSpeech = meanings[0].partOfSpeech;
-                res.json({ partOfSpeech });
-            } else {
-                res.status(404).json({ error: 'No meanings found for the word.' });
-            }
+        const hints = await lookupHints(game.currentWord);
+        if (hints && hints.partOfSpeech) {
+            res.json({ partOfSpeech: hints.partOfSpeech });
         } else {
-            res.status(404).json({ error: 'Word not found in the dictionary API.' });
+            res.status(404).json({ error: 'No meanings found for the word.' });
         }
     } catch (error) {
         console.error('Error fetching hints:', error);
@@ -139,34 +337,23 @@ app.get('/hint-1', async (req, res) => {
 
 // returns the first letter of the solution (hint 2 button)
 app.get('/hint-2', (req, res) => {
-    const first_letter = currentWord[0]
+    const game = req.game;
+    game.hintsUsed.add(2);
+    const first_letter = game.currentWord[0]
     res.send(first_letter) ;
 });
 
 
 // returns the definition of the solution (hint 3 button)
 app.get('/hint-3', async (req, res) => {
+    const game = req.game;
+    game.hintsUsed.add(3);
     try {
-        const apiUrl = `https://api.dictionaryapi.dev/api/v2/entries/en/${currentWord}`;
-        const response = await axios.get(apiUrl);
-
-        if (Array.isArray(response.data) && response.data.length > 0) {
-            const meanings = response.data[0].meanings;
-
-            if (meanings && Array.isArray(meanings) && meanings.length > 0) {
-                const definitions = meanings[0].definitions;
-
-                if (definitions && Array.isArray(definitions) && definitions.length > 0) {
-                    const definition = definitions[0].definition;
-                    res.json({ definition });
-                } else {
-                    res.status(404).json({ error: 'No definitions found for the word.' });
-                }
-            } else {
-                res.status(404).json({ error: 'No meanings found for the word.' });
-            }
+        const hints = await lookupHints(game.currentWord);
+        if (hints && hints.definition) {
+            res.json({ definition: hints.definition });
         } else {
-            res.status(404).json({ error: 'Word not found in the dictionary API.' });
+            res.status(404).json({ error: 'No definitions found for the word.' });
         }
     } catch (error) {
         console.error('Error fetching hints:', error);
@@ -175,35 +362,100 @@ app.get('/hint-3', async (req, res) => {
 });
 
 
-// returns solution(ONLY FOR DISPLAY PURPOSES)
+// returns solution(ONLY FOR DISPLAY PURPOSES), only once the round is solved or finished
 app.get('/get-solution', (req, res) => {
-    res.send(currentWord) ;
+    const game = req.game;
+    if (!game.solved && !game.finished) {
+        res.status(403).json({ error: 'The solution is only shown once the round is over.' });
+        return;
+    }
+    res.send(game.currentWord) ;
 });
 
 
-// returns leaderboard as map array
+// returns the leaderboard. The ETag is the leaderboard version: a matching If-None-Match gets a 304, and a
+// ?since=<version> the server still has history for gets only the entries that entered the top N since then
 app.get('/get-leaderboard', (req, res) => {
-    const highScores = readHighScores(leaderboardFilename);
-    const updatedScoresText = highScores
-        .map((entry, index) => `${index + 1}. ${entry.name}, ${entry.score}`)
-        .join('\n');
-    res.json({ leaderboard: updatedScoresText });
+    const version = leaderboard.versionTag();
+    const etag = `"${version}"`;
+    res.set('ETag', etag);
+    if (req.get('If-None-Match') === etag) {
+        res.status(304).end();
+        return;
+    }
+
+    const changes = req.query.since ? leaderboard.changesSince(req.query.since) : null;
+    if (changes !== null) {
+        res.json({ version: version, delta: true, topN: leaderboard.topN, entries: changes });
+    } else {
+        res.json({ version: version,
+            delta: false,
+            topN: leaderboard.topN,
+            entries: leaderboard.top(),
+            leaderboard: leaderboard.text() });
+    }
 });
 
 
-// Route to update the leaderboard with current round score and username
+// Route to put the session's last solved round on the leaderboard under a username. The score is the one the server
+// computed in /finish-round, a newScore sent by the client is ignored. Each round's score can be submitted once
 app.post('/update-leaderboard', (req, res) => {
-    const { username, newScore } = req.body;
-    if (!username || typeof newScore !== 'number') {
+    const game = req.game;
+    const { username } = req.body;
+    if (!username || typeof username !== 'string') {
         res.status(400).json({ error: 'Invalid request data.' });
         return;
     }
+    if (game.unclaimedScore === null) {
+        res.status(409).json({ error: 'No finished round to submit.' });
+        return;
+    }
 
-    updateLeaderboard(username, newScore);
-    res.json({ message: 'Leaderboard updated successfully.' });
+    const score = game.unclaimedScore;
+    game.unclaimedScore = null;
+    updateLeaderboard(username, score);
+    res.json({ message: 'Leaderboard updated successfully.', score: score });
 });
 
 
+// function to record a round's accuracy and return the completion, round accuracy and game accuracy % along with
+// the running accuracy stats (spread, best and worst round, recent rounds' mean)
+function recordAccuracy(game, guess_attempts) {
+    const cp = (game.complete/game.round)*100;
+    const ra = (1/guess_attempts)*100;
+
+    game.accuracy.add(ra);
+
+    return { completion: cp,
+        round_accuracy: ra,
+        game_accuracy: game.accuracy.mean,
+        accuracy_stats: game.accuracy.toJSON() };
+}
+
+
+// function to return {partOfSpeech, definition} for a word from the local hint store,
+// or from the dictionary API (cached per word) if the hint store has not been built
+async function lookupHints(word) {
+    if (hintStore.available()) {
+        return hintStore.lookup(word);
+    }
+    if (!dictionaryCache.has(word)) {
+        const response = await axios.get(`https://api.dictionaryapi.dev/api/v2/entries/en/${word}`);
+        let hints = null;
+        if (Array.isArray(response.data) && response.data.length > 0) {
+            const meanings = response.data[0].meanings;
+            if (meanings && Array.isArray(meanings) && meanings.length > 0) {
+                const definitions = meanings[0].definitions;
+                hints = { partOfSpeech: meanings[0].partOfSpeech,
+                    definition: Array.isArray(definitions) && definitions.length > 0 ? definitions[0].definition : '' };
+            }
+        }
+        dictionaryCache.set(word, hints);
+    }
+    return dictionaryCache.get(word);
+}
+
+
 // function that takes the solution and randomizes the letter positions
 function scrambleWord(word) {
     let originalWord = word.split('');
@@ -256,66 +508,29 @@ function checkScrambledWord(scrambledWord, originalWord) {
 }
 
 
-// function to return txt file as string array for manipulation purposes
-function readTextFile(filePath, wordLength) {
-    try {
-        const fileContent = fs.readFileSync(filePath, 'utf8');
-        const lines = fileContent.split('\n');
-        const words = [];
-
-        lines.forEach((line) => {
-            const lineWords = line.split(/\s+/); // Split line into words
-            words.push(...lineWords.filter((word) => word.length === wordLength));
-        });
-
-        return words;
-    } catch (error) {
-        console.error('Error reading the file:', error);
-        return null;
-    }
-}
-
-
-// function to select a random word from a string array
-function getRandomWord(wordArray) {
-    if (!Array.isArray(wordArray) || wordArray.length === 0) {
+// function to return the compact [position code, similarity %] of a guess, null if the lengths differ
+function scoreGuess(guess, solution) {
+    if (guess.length !== solution.length) {
         return null;
     }
-    const randomIndex = Math.floor(Math.random() * wordArray.length);
-    return wordArray[randomIndex];
-}
-
-
-// function to read high scores from the file and convert it into a malleable format
-function readHighScores(filename) {
-    try {
-        const data = fs.readFileSync(filename, 'utf-8');
-        const lines = data.split('\n');
-        const highScores = lines
-            .map(line => line.trim())
-            .filter(line => line.length > 0) // Filter out empty lines
-            .map(line => {
-                const [name, score] = line.split(', ');
-                return { name, score: parseInt(score) };
-            });
-        return highScores;
-    } catch (error) {
-        console.error('Error reading high scores:', error);
-        return [];
+    let code = '';
+    let matching = 0;
+    for (let i = 0; i < guess.length; i++) {
+        if (guess[i] === solution[i]) {
+            code += '*';
+            matching++;
+        } else {
+            code += '-';
+        }
     }
+    return [code, Math.round(matching / solution.length * 10000) / 100];
 }
 
 
-// function to update leaderboard with new score and username and keeps the top 10
+// function to add a new score and username to the leaderboard
 function updateLeaderboard(username, newScore) {
-    const highScores = readHighScores(leaderboardFilename);
-    highScores.push({ name: username, score: newScore });
-    highScores.sort((a, b) => b.score - a.score);
-    const N = 10;
-    const topScores = highScores.slice(0, N);
     try {
-        const leaderboardText = topScores.map(entry => `${entry.name}, ${entry.score}`).join('\n');
-        fs.writeFileSync(leaderboardFilename, leaderboardText);
+        leaderboard.submit(username, newScore);
     } catch (error) {
         console.error('Error updating leaderboard:', error);
     }
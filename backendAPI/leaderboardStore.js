@@ -0,0 +1,324 @@
+// Leaderboard storage engine.
+//
+// leaderboard.txt is an append-only log of "name, score" lines. A new score is one appended line instead of a full
+// re-read, sort and rewrite. In memory, the best topN entries are kept in a min-heap, so a submission costs O(log n),
+// and the log is compacted back down to the top scores every compactEvery appends.
+//
+// Several writers (server processes and frontend/leaderboard_store.py, which uses the same file format and lock
+// protocol) can share one file. Every write happens under an exclusive lock file, and each writer picks up the
+// others' appends by reading the new tail of the log. Readers don't take the lock, so they only load up to the last
+// newline: anything after it may be a line another writer is still appending, and is read again next time.
+//
+// Every change to the top N bumps a version number. Clients send the version they already have, and get back either
+// nothing (unchanged) or only the entries that entered the top N since then.
+
+const crypto = require('crypto');
+const fs = require('fs');
+
+const lockTimeoutMs = 5000;
+const staleLockMs = 10000;
+const sleepBuffer = new Int32Array(new SharedArrayBuffer(4));
+
+// function to compare two entries, true if a ranks below b (lower score, or same score but submitted later)
+function ranksBelow(a, b) {
+    return a.score < b.score || (a.score === b.score && a.seq > b.seq);
+}
+
+// function to parse a "name, score" log line, returns null for blank or malformed lines
+function parseLine(line) {
+    line = line.trim();
+    const split = line.lastIndexOf(', ');
+    if (split === -1) {
+        return null;
+    }
+    const score = parseInt(line.slice(split + 2), 10);
+    if (Number.isNaN(score)) {
+        return null;
+    }
+    return { name: line.slice(0, split), score };
+}
+
+
+// bounded min-heap holding the best `capacity` entries, the root is the lowest ranked entry
+class TopHeap {
+    constructor(capacity) {
+        this.capacity = capacity;
+        this.items = [];
+    }
+
+    // adds an entry if it makes the top, returns true if it was kept
+    offer(entry) {
+        const items = this.items;
+        if (items.length < this.capacity) {
+            items.push(entry);
+            this.siftUp(items.length - 1);
+            return true;
+        }
+        if (this.capacity === 0 || !ranksBelow(items[0], entry)) {
+            return false;
+        }
+        items[0] = entry;
+        this.siftDown(0);
+        return true;
+    }
+
+    siftUp(i) {
+        const items = this.items;
+        while (i > 0) {
+            const parent = (i - 1) >> 1;
+            if (!ranksBelow(items[i], items[parent])) {
+                break;
+            }
+            [items[i], items[parent]] = [items[parent], items[i]];
+            i = parent;
+        }
+    }
+
+    siftDown(i) {
+        const items = this.items;
+        for (;;) {
+            const left = 2 * i + 1;
+            const right = left + 1;
+            let lowest = i;
+            if (left < items.length && ranksBelow(items[left], items[lowest])) {
+                lowest = left;
+            }
+            if (right < items.length && ranksBelow(items[right], items[lowest])) {
+                lowest = right;
+            }
+            if (lowest === i) {
+                return;
+            }
+            [items[i], items[lowest]] = [items[lowest], items[i]];
+            i = lowest;
+        }
+    }
+
+    // entries from best to worst
+    sorted() {
+        return this.items.slice().sort((a, b) => (ranksBelow(a, b) ? 1 : -1));
+    }
+}
+
+
+class LeaderboardStore {
+    constructor(filePath, { topN = 10, compactEvery = 1000 } = {}) {
+        this.filePath = filePath;
+        this.lockPath = filePath + '.lock';
+        this.topN = topN;
+        this.compactEvery = compactEvery;
+        this.stats = { submissions: 0, compactions: 0, lockWaits: 0 };
+        // versions are only comparable within one epoch (one store instance)
+        this.epoch = crypto.randomBytes(4).toString('hex');
+        this.version = 0;
+        this.baseVersion = 0;
+        this.changes = [];
+        this.maxChanges = 1000;
+        this.reloading = false;
+        this.reset();
+        this.refresh();
+    }
+
+    reset() {
+        this.heap = new TopHeap(this.topN);
+        this.offset = 0;
+        this.inode = null;
+        this.seq = 0;
+        this.logLines = 0;
+        this.unterminated = false;
+        this.cache = null;
+    }
+
+    // reads log lines appended since the last refresh (by this or any other writer), reloads after a compaction.
+    // locked is true while this store holds the lock, nobody can be appending then so a line without a newline is complete
+    refresh(locked = false) {
+        let stat;
+        try {
+            stat = fs.statSync(this.filePath);
+        } catch (error) {
+            if (error.code !== 'ENOENT') {
+                throw error;
+            }
+            if (this.inode !== null) {
+                this.reload(null, locked);
+            }
+            return;
+        }
+        if (stat.ino !== this.inode || stat.size < this.offset) {
+            this.reload(stat, locked);
+        } else if (stat.size > this.offset) {
+            this.readTail(stat, locked);
+        }
+    }
+
+    // rebuilds the heap from the whole log (first load, or after a compaction), a new version is only started if
+    // the top N actually changed, older versions then get a full leaderboard instead of a delta
+    reload(stat, locked) {
+        const previous = this.heap.sorted();
+        this.reset();
+        if (stat !== null) {
+            this.inode = stat.ino;
+            this.reloading = true;
+            try {
+                this.readTail(stat, locked);
+            } finally {
+                this.reloading = false;
+            }
+        }
+        const current = this.heap.sorted();
+        const same = previous.length === current.length &&
+            previous.every((entry, i) => entry.name === current[i].name && entry.score === current[i].score);
+        if (!same) {
+            this.version++;
+            this.baseVersion = this.version;
+            this.changes = [];
+        }
+    }
+
+    // reads and loads the complete lines from the current offset to the end of the file. A last line without a newline
+    // is left for the next read, unless the lock is held: then it is a hand-written or legacy log's complete last line
+    readTail(stat, locked) {
+        const fd = fs.openSync(this.filePath, 'r');
+        try {
+            const buffer = Buffer.alloc(stat.size - this.offset);
+            const read = fs.readSync(fd, buffer, 0, buffer.length, this.offset);
+            const end = buffer.lastIndexOf(0x0a, read - 1) + 1;
+            this.offset += end;
+            buffer.toString('utf8', 0, end).split('\n').forEach((line) => this.load(line));
+            this.unterminated = end < read;
+            if (this.unterminated && locked) {
+                this.load(buffer.toString('utf8', end, read));
+                this.offset += read - end;
+            }
+        } finally {
+            fs.closeSync(fd);
+        }
+    }
+
+    load(line) {
+        const entry = parseLine(line);
+        if (entry === null) {
+            return;
+        }
+        entry.seq = this.seq++;
+        this.logLines++;
+        if (this.heap.offer(entry)) {
+            this.cache = null;
+            if (!this.reloading) {
+                this.version++;
+                this.changes.push({ version: this.version, name: entry.name, score: entry.score });
+                if (this.changes.length > this.maxChanges) {
+                    this.baseVersion = this.changes.shift().version;
+                }
+            }
+        }
+    }
+
+    // runs fn while holding the lock file, waits for other writers (a lock older than staleLockMs is broken)
+    withLock(fn) {
+        const started = Date.now();
+        let fd;
+        for (;;) {
+            try {
+                fd = fs.openSync(this.lockPath, 'wx');
+                break;
+            } catch (error) {
+                if (error.code !== 'EEXIST') {
+                    throw error;
+                }
+            }
+            this.stats.lockWaits++;
+            try {
+                if (Date.now() - fs.statSync(this.lockPath).mtimeMs > staleLockMs) {
+                    fs.unlinkSync(this.lockPath);
+                    continue;
+                }
+            } catch (error) {
+                continue;
+            }
+            if (Date.now() - started > lockTimeoutMs) {
+                throw new Error('Timed out waiting for the leaderboard lock.');
+            }
+            Atomics.wait(sleepBuffer, 0, 0, 1);
+        }
+        try {
+            return fn();
+        } finally {
+            fs.closeSync(fd);
+            fs.unlinkSync(this.lockPath);
+        }
+    }
+
+    // appends a new score to the log, returns true if it made the top N
+    submit(name, score) {
+        name = String(name).replace(/[\r\n]+/g, ' ').trim();
+        return this.withLock(() => {
+            this.refresh(true);
+            const prefix = this.unterminated ? '\n' : '';
+            fs.appendFileSync(this.filePath, `${prefix}${name}, ${score}\n`);
+            this.stats.submissions++;
+            // nobody else can append while the lock is held, so the last line read is this submission
+            this.refresh(true);
+            const mine = this.seq - 1;
+            const entered = this.heap.items.some((entry) => entry.seq === mine);
+            if (this.logLines - this.topN >= this.compactEvery) {
+                this.compactLocked();
+            }
+            return entered;
+        });
+    }
+
+    // rewrites the log with only the top N entries
+    compact() {
+        this.withLock(() => {
+            this.refresh(true);
+            this.compactLocked();
+        });
+    }
+
+    compactLocked() {
+        const tempPath = this.filePath + '.tmp';
+        const text = this.top().map((entry) => `${entry.name}, ${entry.score}\n`).join('');
+        fs.writeFileSync(tempPath, text);
+        fs.renameSync(tempPath, this.filePath);
+        this.stats.compactions++;
+        this.refresh(true);
+    }
+
+    // returns the best n entries as [{name, score}], n is at most topN
+    top(n = this.topN) {
+        this.refresh();
+        if (this.cache === null) {
+            this.cache = this.heap.sorted().map((entry) => ({ name: entry.name, score: entry.score }));
+        }
+        return this.cache.slice(0, n);
+    }
+
+    // returns the current version tag ("epoch-version")
+    versionTag() {
+        this.refresh();
+        return `${this.epoch}-${this.version}`;
+    }
+
+    // returns the [{name, score}] entries that entered the top N after the given version tag,
+    // or null if the tag is from another epoch or too old for a delta
+    changesSince(tag) {
+        this.refresh();
+        const [epoch, version] = String(tag).split('-');
+        const since = Number(version);
+        if (epoch !== this.epoch || !Number.isInteger(since) || since < this.baseVersion || since > this.version) {
+            return null;
+        }
+        return this.changes
+            .filter((change) => change.version > since)
+            .map((change) => ({ name: change.name, score: change.score }));
+    }
+
+    // returns the leaderboard as numbered "rank. name, score" lines
+    text(n = this.topN) {
+        return this.top(n).map((entry, index) => `${index + 1}. ${entry.name}, ${entry.score}`).join('\n');
+    }
+}
+
+
+module.exports = { LeaderboardStore, TopHeap, parseLine };
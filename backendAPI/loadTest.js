@@ -0,0 +1,121 @@
+// Load test for concurrent sessions.
+//
+// Starts N sessions against a running server and has each one play rounds back to back
+// (/session, then /get-word, a wrong /check-word, the right /check-word and /finish-round per round)
+// for the given duration. The right word is looked up in the anagram index of words.txt, /get-solution is refused
+// until the round is over. Reports rounds and requests per second and request latency percentiles.
+// Rounds are finished without a username so the leaderboard is left alone.
+//
+// Usage:
+//     node loadTest.js [--url http://localhost:3000] [--sessions 50] [--duration 10] [--letters 4]
+
+const fs = require('fs');
+const http = require('http');
+const path = require('path');
+const { URL } = require('url');
+const { AnagramIndex } = require('./anagramIndex');
+const { buildBuckets } = require('./wordIndex');
+
+// function to parse --name value command line options
+function parseArgs(argv) {
+    const options = { url: 'http://localhost:3000', sessions: 50, duration: 10, letters: 4 };
+    for (let i = 0; i < argv.length; i += 2) {
+        const name = argv[i].replace(/^--/, '');
+        if (!(name in options)) {
+            throw new Error(`Unknown option ${argv[i]}`);
+        }
+        options[name] = name === 'url' ? argv[i + 1] : Number(argv[i + 1]);
+    }
+    return options;
+}
+
+const options = parseArgs(process.argv.slice(2));
+const base = new URL(options.url);
+const agent = new http.Agent({ keepAlive: true, maxSockets: options.sessions });
+const latencies = [];
+let errors = 0;
+const anagrams = AnagramIndex.fromBuckets(buildBuckets(fs.readFileSync(path.join(__dirname, 'words.txt'), 'utf8')));
+
+// function to send one request and resolve with {status, body}
+function request(method, path, sessionId, body) {
+    return new Promise((resolve, reject) => {
+        const payload = body === undefined ? null : JSON.stringify(body);
+        const headers = {};
+        if (sessionId) {
+            headers['X-Session-Id'] = sessionId;
+        }
+        if (payload !== null) {
+            headers['Content-Type'] = 'application/json';
+            headers['Content-Length'] = Buffer.byteLength(payload);
+        }
+        const started = process.hrtime.bigint();
+        const req = http.request({ host: base.hostname, port: base.port, path, method, headers, agent }, (res) => {
+            let data = '';
+            res.setEncoding('utf8');
+            res.on('data', (chunk) => { data += chunk; });
+            res.on('end', () => {
+                latencies.push(Number(process.hrtime.bigint() - started) / 1e6);
+                if (res.statusCode !== 200) {
+                    errors++;
+                }
+                resolve({ status: res.statusCode, body: data });
+            });
+        });
+        req.on('error', (error) => {
+            errors++;
+            reject(error);
+        });
+        if (payload !== null) {
+            req.write(payload);
+        }
+        req.end();
+    });
+}
+
+// function for one simulated player, plays rounds until the deadline and returns the number of finished rounds
+async function player(deadline) {
+    const session = JSON.parse((await request('GET', '/session')).body).session;
+    let rounds = 0;
+    while (Date.now() < deadline) {
+        try {
+            const scramble = JSON.parse((await request('POST', '/get-word', session, { letters: options.letters })).body).word;
+            const solution = anagrams.anagrams(scramble)[0];
+            await request('POST', '/check-word', session, { word: solution.split('').reverse().join('') });
+            await request('POST', '/check-word', session, { word: solution });
+            await request('POST', '/finish-round', session, { guess_attempts: 2, elapsed: 1, hints: [] });
+            rounds++;
+        } catch (error) {
+            // connection errors are counted in request()
+        }
+    }
+    return rounds;
+}
+
+// function to return the p-th percentile of a sorted array
+function percentile(sorted, p) {
+    if (sorted.length === 0) {
+        return 0;
+    }
+    return sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p / 100))];
+}
+
+async function main() {
+    const started = Date.now();
+    const deadline = started + options.duration * 1000;
+    const results = await Promise.all(Array.from({ length: options.sessions }, () => player(deadline)));
+    const seconds = (Date.now() - started) / 1000;
+    const rounds = results.reduce((a, b) => a + b, 0);
+    const sorted = latencies.slice().sort((a, b) => a - b);
+
+    console.log(`sessions: ${options.sessions}, duration: ${seconds.toFixed(1)} s`);
+    console.log(`rounds: ${rounds} (${(rounds / seconds).toFixed(1)} rounds/s)`);
+    console.log(`requests: ${latencies.length} (${(latencies.length / seconds).toFixed(1)} req/s), errors: ${errors}`);
+    console.log(`latency ms: p50 ${percentile(sorted, 50).toFixed(2)}, p95 ${percentile(sorted, 95).toFixed(2)}, ` +
+        `p99 ${percentile(sorted, 99).toFixed(2)}, max ${percentile(sorted, 100).toFixed(2)}`);
+    agent.destroy();
+}
+
+main().catch((error) => {
+    console.error(error);
+    process.exit(1);
+});
@@ -0,0 +1,140 @@
+// Durable round history.
+//
+// Every finished round is appended to rounds.jsonl as one JSON line:
+//     {"at": 1718000000000, "user": "name", "word": "stop", "solved": true, "guesses": 3, "elapsed": 4.2, "hints": [1], "score": 20}
+// Running totals over the whole log are kept in memory and updated in O(1) per round. Every snapshotEvery rounds
+// they are saved, together with the log offset they cover, to rounds.jsonl.summary.json. A restart then only reads
+// the part of the log written after the snapshot, and nothing is lost.
+//
+// Like the leaderboard, several writers (server processes and frontend/round_history.py) can share one log. Each
+// writer folds in everything appended since its last read, so the totals always cover the whole log.
+// frontend/build_word_stats.py and frontend/analyze_rounds.py read the same log.
+
+const fs = require('fs');
+
+// function to return empty running totals
+function emptyTotals() {
+    return { rounds: 0, solved: 0, guesses: 0, elapsed: 0, score: 0, hints: { 1: 0, 2: 0, 3: 0 } };
+}
+
+
+class RoundHistory {
+    constructor(filePath, { snapshotEvery = 1000 } = {}) {
+        this.filePath = filePath;
+        this.summaryPath = filePath + '.summary.json';
+        this.snapshotEvery = snapshotEvery;
+        this.totals = emptyTotals();
+        this.offset = 0;
+        this.inode = null;
+        this.sinceSnapshot = 0;
+        this.loadSnapshot();
+        this.refresh();
+    }
+
+    // starts from the saved totals if they still match the log (same file, not shorter than the saved offset)
+    loadSnapshot() {
+        let snapshot;
+        let stat;
+        try {
+            snapshot = JSON.parse(fs.readFileSync(this.summaryPath, 'utf8'));
+            stat = fs.statSync(this.filePath);
+        } catch (error) {
+            return;
+        }
+        if (snapshot.inode === stat.ino && snapshot.offset <= stat.size && snapshot.totals) {
+            this.totals = snapshot.totals;
+            this.offset = snapshot.offset;
+            this.inode = stat.ino;
+        }
+    }
+
+    saveSnapshot() {
+        const tempPath = `${this.summaryPath}.${process.pid}.tmp`;
+        fs.writeFileSync(tempPath, JSON.stringify({ inode: this.inode, offset: this.offset, totals: this.totals }));
+        fs.renameSync(tempPath, this.summaryPath);
+        this.sinceSnapshot = 0;
+    }
+
+    // folds in the complete lines appended since the last read (by this or any other writer)
+    refresh() {
+        let stat;
+        try {
+            stat = fs.statSync(this.filePath);
+        } catch (error) {
+            if (error.code !== 'ENOENT') {
+                throw error;
+            }
+            return;
+        }
+        if (stat.ino !== this.inode || stat.size < this.offset) {
+            this.totals = emptyTotals();
+            this.offset = 0;
+            this.inode = stat.ino;
+        }
+        if (stat.size === this.offset) {
+            return;
+        }
+        const fd = fs.openSync(this.filePath, 'r');
+        try {
+            const buffer = Buffer.alloc(stat.size - this.offset);
+            const read = fs.readSync(fd, buffer, 0, buffer.length, this.offset);
+            // a line another writer is still appending is left for the next read
+            const end = buffer.lastIndexOf(0x0a, read - 1) + 1;
+            buffer.toString('utf8', 0, end).split('\n').forEach((line) => this.fold(line));
+            this.offset += end;
+        } finally {
+            fs.closeSync(fd);
+        }
+    }
+
+    fold(line) {
+        let round;
+        try {
+            round = JSON.parse(line);
+        } catch (error) {
+            return;
+        }
+        if (round === null || typeof round !== 'object') {
+            return;
+        }
+        const totals = this.totals;
+        totals.rounds++;
+        totals.solved += round.solved ? 1 : 0;
+        totals.guesses += Number(round.guesses) || 0;
+        totals.elapsed += Number(round.elapsed) || 0;
+        totals.score += Number(round.score) || 0;
+        (Array.isArray(round.hints) ? round.hints : []).forEach((hint) => {
+            if (hint in totals.hints) {
+                totals.hints[hint]++;
+            }
+        });
+    }
+
+    // appends one finished round to the log
+    record({ user, word, solved, guesses, elapsed, hints, score }) {
+        const round = { at: Date.now(), user: user || '', word, solved: Boolean(solved), guesses, elapsed,
+            hints: hints || [], score };
+        fs.appendFileSync(this.filePath, JSON.stringify(round) + '\n');
+        this.refresh();
+        if (++this.sinceSnapshot >= this.snapshotEvery) {
+            this.saveSnapshot();
+        }
+    }
+
+    // returns the aggregates over every round in the log
+    summary() {
+        this.refresh();
+        const totals = this.totals;
+        const rounds = totals.rounds || 1;
+        return { rounds: totals.rounds,
+            solved: totals.solved,
+            solve_rate: totals.solved / rounds * 100,
+            mean_guesses: totals.guesses / rounds,
+            mean_elapsed: totals.elapsed / rounds,
+            mean_score: totals.score / rounds,
+            hints: { ...totals.hints } };
+    }
+}
+
+
+module.exports = { RoundHistory };
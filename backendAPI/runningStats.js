@@ -0,0 +1,72 @@
+// Running statistics over a stream of numbers.
+//
+// Each add() is O(1) and the memory is fixed, however many values have been added. Count, sum, min and max are kept
+// directly. The mean and variance use Welford's update, which stays accurate over millions of values where summing
+// squares would not. The mean of the last `window` values comes from a ring buffer and a running window sum. The
+// window sum is recomputed from the ring every time it wraps, so rounding errors cannot build up.
+// frontend/running_stats.py mirrors this module.
+
+class RunningStats {
+    constructor(window = 10) {
+        this.window = window;
+        this.recent = new Float64Array(window);
+        this.next = 0;
+        this.count = 0;
+        this.sum = 0;
+        this.mean = 0;
+        this.m2 = 0;
+        this.min = Infinity;
+        this.max = -Infinity;
+        this.windowSum = 0;
+    }
+
+    add(value) {
+        this.count++;
+        this.sum += value;
+        const delta = value - this.mean;
+        this.mean += delta / this.count;
+        this.m2 += delta * (value - this.mean);
+        this.min = Math.min(this.min, value);
+        this.max = Math.max(this.max, value);
+
+        if (this.window > 0) {
+            this.windowSum += value - this.recent[this.next];
+            this.recent[this.next] = value;
+            this.next = (this.next + 1) % this.window;
+            if (this.next === 0) {
+                this.windowSum = this.recent.reduce((total, recent) => total + recent, 0);
+            }
+        }
+    }
+
+    // population variance of every value added so far
+    get variance() {
+        return this.count > 0 ? this.m2 / this.count : 0;
+    }
+
+    get stddev() {
+        return Math.sqrt(this.variance);
+    }
+
+    // mean of the last `window` values (fewer until that many have been added)
+    get recentMean() {
+        const size = Math.min(this.count, this.window);
+        return size > 0 ? this.windowSum / size : 0;
+    }
+
+    toJSON() {
+        const empty = this.count === 0;
+        return { count: this.count,
+            sum: this.sum,
+            mean: this.mean,
+            variance: this.variance,
+            stddev: this.stddev,
+            min: empty ? 0 : this.min,
+            max: empty ? 0 : this.max,
+            recent_mean: this.recentMean,
+            window: Math.min(this.count, this.window) };
+    }
+}
+
+
+module.exports = { RunningStats };
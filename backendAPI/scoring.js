@@ -0,0 +1,28 @@
+// Round scoring, shared by the server and the Python client.
+//
+// The rules live in scoring.json so both sides read the same numbers. frontend/scoring.py loads the same file:
+// the client uses it to predict the score the moment a word is solved, the server computes the score that counts
+// from its own round clock and hint record.
+
+const fs = require('fs');
+const path = require('path');
+
+const rules = JSON.parse(fs.readFileSync(path.join(__dirname, 'scoring.json'), 'utf8'));
+
+// function to calculate the round score from the word length, solve time (seconds) and the hints used
+function calculateScore(wordLength, elapsed, hints) {
+    const wordScore = wordLength * rules.wordPoints;
+
+    const bonus = rules.timeBonuses.find((timeBonus) => elapsed < timeBonus.under);
+    const timeScore = bonus ? bonus.points : 0;
+
+    let hintScore = 0;
+    new Set(Array.from(hints, Number)).forEach((hint) => {
+        hintScore -= rules.hintPenalties[hint] || 0;
+    });
+
+    return wordScore + timeScore + hintScore;
+}
+
+
+module.exports = { calculateScore, rules };
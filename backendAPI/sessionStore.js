@@ -0,0 +1,94 @@
+// Per-player game state.
+//
+// Every client gets its own session from /session and sends the id back in the X-Session-Id header, so players
+// sharing one server no longer overwrite each other's word and stats. Sessions live in a bounded map: the least
+// recently used session is evicted when the store is full and idle sessions expire after the TTL.
+
+const crypto = require('crypto');
+const { RunningStats } = require('./runningStats');
+
+// rounds covered by the recent accuracy mean
+const accuracyWindow = 10;
+
+// function to create the game variables for a new session
+function newGameState() {
+    return {
+        currentWord: '',
+        scramble: '',
+        round: 0,
+        complete: 0,
+        solved: false,
+        // running round accuracy % statistics, O(1) per round
+        accuracy: new RunningStats(accuracyWindow),
+        // the server's own record of the current round, the score is computed from these and not from the client
+        roundStarted: 0,
+        solvedAt: 0,
+        hintsUsed: new Set(),
+        // set by /finish-round, a round is only finished (scored and put on the leaderboard) once. No round has
+        // been started yet, so there is nothing to finish
+        finished: true,
+        // score of the last solved round that has not been put on the leaderboard yet
+        unclaimedScore: null,
+        // words handed out by /prefetch-word that have not been started yet, keyed by token
+        pendingRounds: new Map(),
+    };
+}
+
+class SessionStore {
+    constructor(maxSessions = 10000, ttlMs = 30 * 60 * 1000) {
+        this.maxSessions = maxSessions;
+        this.ttlMs = ttlMs;
+        this.sessions = new Map();
+    }
+
+    // creates a new session and returns its id
+    create() {
+        const id = crypto.randomUUID();
+        this.sessions.set(id, { state: newGameState(), lastSeen: Date.now() });
+        while (this.sessions.size > this.maxSessions) {
+            this.sessions.delete(this.sessions.keys().next().value);
+        }
+        return id;
+    }
+
+    // returns the game state for a session id, or null if the session is unknown or expired
+    get(id) {
+        const entry = this.sessions.get(id);
+        if (!entry) {
+            return null;
+        }
+        const now = Date.now();
+        this.sessions.delete(id);
+        if (now - entry.lastSeen > this.ttlMs) {
+            return null;
+        }
+        // re-inserting keeps the map ordered from least to most recently used
+        entry.lastSeen = now;
+        this.sessions.set(id, entry);
+        return entry.state;
+    }
+
+    // removes expired sessions, the map is in last-used order so the sweep stops at the first live one
+    sweep() {
+        const now = Date.now();
+        for (const [id, entry] of this.sessions) {
+            if (now - entry.lastSeen <= this.ttlMs) {
+                break;
+            }
+            this.sessions.delete(id);
+        }
+    }
+
+    // sweeps expired sessions periodically without keeping the process alive
+    startSweeper(intervalMs = 60 * 1000) {
+        setInterval(() => this.sweep(), intervalMs).unref();
+        return this;
+    }
+
+    get size() {
+        return this.sessions.size;
+    }
+}
+
+
+module.exports = { SessionStore, newGameState };
@@ -0,0 +1,102 @@
+// In-memory word pool for /get-word.
+//
+// words.txt is read once and bucketed by word length, so picking a random word of a given length is a single
+// array lookup. The file is watched and the buckets are rebuilt whenever it changes on disk.
+// An anagram index (anagramIndex.js) is built with the buckets. Ambiguous words, whose letters spell more than one
+// dictionary word, are skipped when picking a word, unless a length has nothing else.
+// With a target difficulty, words are picked by their rating in word_stats.tsv (wordStats.js) instead of uniformly.
+// frontend/word_index.py mirrors this module so the Python client picks words with the same semantics.
+
+const fs = require('fs');
+const { AnagramIndex } = require('./anagramIndex');
+const { DifficultySampler, loadWordStats } = require('./wordStats');
+
+class WordIndex {
+    constructor(filePath, watchInterval = 2000, { skipAmbiguous = true, statsPath = null } = {}) {
+        this.filePath = filePath;
+        this.statsPath = statsPath;
+        this.watchInterval = watchInterval;
+        this.skipAmbiguous = skipAmbiguous;
+        this.buckets = new Map();
+        this.choices = new Map();
+        this.anagrams = new AnagramIndex();
+        this.sampler = new DifficultySampler(new Map(), new Map());
+        this.load();
+    }
+
+    // reads the word file and rebuilds the length buckets, the anagram index and the difficulty sampler (the previous
+    // ones are kept if the read fails)
+    load() {
+        try {
+            const fileContent = fs.readFileSync(this.filePath, 'utf8');
+            const buckets = buildBuckets(fileContent);
+            const anagrams = AnagramIndex.fromBuckets(buckets);
+            this.choices = this.skipAmbiguous ? buildChoices(buckets, anagrams) : buckets;
+            this.sampler = new DifficultySampler(this.choices, this.statsPath ? loadWordStats(this.statsPath) : new Map());
+            this.anagrams = anagrams;
+            this.buckets = buckets;
+        } catch (error) {
+            console.error('Error reading the file:', error);
+        }
+    }
+
+    // reloads the buckets when the word file is modified
+    watch() {
+        fs.watchFile(this.filePath, { interval: this.watchInterval, persistent: false }, (curr, prev) => {
+            if (curr.mtimeMs !== prev.mtimeMs) {
+                this.load();
+            }
+        });
+        return this;
+    }
+
+    // returns all words with the given number of letters
+    words(wordLength) {
+        return this.buckets.get(wordLength) || [];
+    }
+
+    // returns a random word with the given number of letters, or null if there are none. With a target difficulty
+    // (0 easiest to 1 hardest) words rated near the target are picked most often
+    randomWord(wordLength, difficulty = null) {
+        if (difficulty !== null) {
+            return this.sampler.sample(wordLength, difficulty);
+        }
+        const words = this.choices.get(wordLength);
+        if (!words || words.length === 0) {
+            return null;
+        }
+        return words[Math.floor(Math.random() * words.length)];
+    }
+}
+
+
+// function to split the file into words (whitespace separated, one or more per line) and bucket them by length
+function buildBuckets(fileContent) {
+    const buckets = new Map();
+    fileContent.split('\n').forEach((line) => {
+        line.split(/\s+/).forEach((word) => {
+            if (word.length === 0) {
+                return;
+            }
+            if (!buckets.has(word.length)) {
+                buckets.set(word.length, []);
+            }
+            buckets.get(word.length).push(word);
+        });
+    });
+    return buckets;
+}
+
+
+// function to drop the ambiguous words from each bucket, a bucket with only ambiguous words is kept whole
+function buildChoices(buckets, anagrams) {
+    const choices = new Map();
+    buckets.forEach((words, length) => {
+        const unambiguous = words.filter((word) => !anagrams.isAmbiguous(word));
+        choices.set(length, unambiguous.length > 0 ? unambiguous : words);
+    });
+    return choices;
+}
+
+
+module.exports = { WordIndex, buildBuckets, buildChoices };
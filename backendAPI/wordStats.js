@@ -0,0 +1,108 @@
+// Per-word difficulty ratings and difficulty-targeted word selection.
+//
+// word_stats.tsv is built offline by frontend/build_word_stats.py. It has one
+// "word<TAB>letter score<TAB>anagrams<TAB>plays<TAB>solves<TAB>guesses<TAB>difficulty" line per word, where
+// difficulty is the word's rank among the words of its length, from 0 (easiest) to 1 (hardest).
+// To pick a word for a target difficulty, each word is weighted by how close its rating is to the target. The
+// weights of a length bucket are summed into a cumulative array once per target level, so a pick is one random
+// number and a binary search, O(log n). frontend/word_stats.py mirrors this module.
+
+const fs = require('fs');
+
+// named difficulty targets, a number from 0 to 1 is also accepted
+const difficultyLevels = { easy: 0.2, medium: 0.5, hard: 0.8 };
+// how far from the target (in rating) a word still gets picked regularly
+const spread = 0.15;
+// targets are rounded to this step so each bucket only ever has a few cumulative arrays
+const levelStep = 0.05;
+// rating for words missing from the table (added to words.txt after it was built)
+const unrated = 0.5;
+
+// function to turn a difficulty parameter (a level name or a number from 0 to 1) into a target, null for no target.
+// Throws for anything else
+function parseDifficulty(value) {
+    if (value === undefined || value === null || value === '' || value === 'any') {
+        return null;
+    }
+    const name = String(value).toLowerCase();
+    if (Object.prototype.hasOwnProperty.call(difficultyLevels, name)) {
+        return difficultyLevels[name];
+    }
+    const target = Number(value);
+    if (!Number.isFinite(target) || target < 0 || target > 1) {
+        throw new Error('Difficulty must be easy, medium, hard or a number between 0 and 1.');
+    }
+    return target;
+}
+
+// function to return a Map of word -> difficulty from the stats table, empty if it has not been built
+function loadWordStats(filePath) {
+    const ratings = new Map();
+    let content;
+    try {
+        content = fs.readFileSync(filePath, 'utf8');
+    } catch (error) {
+        if (error.code !== 'ENOENT') {
+            console.error('Error reading the word stats:', error);
+        }
+        return ratings;
+    }
+    content.split('\n').forEach((line) => {
+        const fields = line.split('\t');
+        if (fields.length === 7) {
+            ratings.set(fields[0], parseFloat(fields[6]));
+        }
+    });
+    return ratings;
+}
+
+
+class DifficultySampler {
+    constructor(buckets, ratings) {
+        this.buckets = buckets;
+        this.ratings = ratings;
+        this.cumulative = new Map();
+    }
+
+    cumulativeWeights(length, level) {
+        const key = `${length}:${level.toFixed(2)}`;
+        let weights = this.cumulative.get(key);
+        if (weights === undefined) {
+            const words = this.buckets.get(length) || [];
+            weights = new Float64Array(words.length);
+            let total = 0;
+            words.forEach((word, i) => {
+                const rating = this.ratings.has(word) ? this.ratings.get(word) : unrated;
+                total += Math.exp(-0.5 * ((rating - level) / spread) ** 2) + 1e-9;
+                weights[i] = total;
+            });
+            this.cumulative.set(key, weights);
+        }
+        return weights;
+    }
+
+    // returns a word of the given length picked around the target difficulty, or null if there are none
+    sample(length, target) {
+        const words = this.buckets.get(length);
+        if (!words || words.length === 0) {
+            return null;
+        }
+        const cumulative = this.cumulativeWeights(length, Math.round(target / levelStep) * levelStep);
+        const r = Math.random() * cumulative[cumulative.length - 1];
+        // first index whose cumulative weight is above r
+        let low = 0;
+        let high = cumulative.length - 1;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (cumulative[mid] > r) {
+                high = mid;
+            } else {
+                low = mid + 1;
+            }
+        }
+        return words[low];
+    }
+}
+
+
+module.exports = { DifficultySampler, loadWordStats, parseDifficulty, difficultyLevels };
@@ -0,0 +1,51 @@
+# Anagram index over the word list, the Python twin of backendAPI/anagramIndex.js.
+#
+# Every word is filed under its signature, its letters in sorted order, so all the dictionary anagrams of a
+# scramble are one dictionary lookup away. The index decides which guesses count as solving a round (any dictionary
+# anagram of the solution, not only the solution itself), which words are ambiguous (more than one dictionary word
+# for the same letters) and what the solvers guess. Signatures and lookups ignore case.
+
+
+# function to return the anagram signature of a word: its lowercased letters in sorted order
+def signature(word):
+    return ''.join(sorted(word.lower()))
+
+
+class AnagramIndex:
+    def __init__(self, words=()):
+        self.groups = {}
+        self.words = set()
+        for word in words:
+            self.add(word)
+
+    @classmethod
+    def from_buckets(cls, buckets):
+        index = cls()
+        for words in buckets.values():
+            for word in words:
+                index.add(word)
+        return index
+
+    def add(self, word):
+        key = word.lower()
+        if key in self.words:
+            return
+        self.words.add(key)
+        self.groups.setdefault(signature(key), []).append(key)
+
+    def is_word(self, word):
+        return word.lower() in self.words
+
+# returns the dictionary words made of exactly the given letters (the solutions of a scramble)
+    def anagrams(self, letters):
+        return self.groups.get(signature(letters), [])
+
+# a word is ambiguous if its letters also spell another dictionary word
+    def is_ambiguous(self, word):
+        return len(self.anagrams(word)) > 1
+
+# true if the guess solves a round whose word is solution: the solution itself or another dictionary anagram of it
+    def accepts(self, guess, solution):
+        if guess == solution:
+            return True
+        return len(guess) == len(solution) and signature(guess) == signature(solution) and self.is_word(guess)
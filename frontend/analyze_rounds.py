@@ -0,0 +1,47 @@
+# Per-user and per-word analytics over the round history (backendAPI/rounds.jsonl).
+#
+# Rounds are streamed one line at a time. Memory grows with the number of users and words, not with the number of
+# rounds, so logs with millions of rounds are fine.
+#
+# Usage:
+#     python analyze_rounds.py [rounds.jsonl ...] [--top 10] [--min-rounds 5] [--json report.json]
+
+import argparse
+import json
+import time
+
+from round_history import RoundAnalytics, default_rounds_path
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Summarize the round history per user and per word.')
+    parser.add_argument('paths', nargs='*', default=[default_rounds_path], help='round history files (JSON lines)')
+    parser.add_argument('--top', type=int, default=10, help='users and words to list')
+    parser.add_argument('--min-rounds', type=int, default=5, help='rounds a word needs to be ranked by solve rate')
+    parser.add_argument('--json', help='also write the full per-user and per-word report to this file')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    analytics = RoundAnalytics.from_paths(args.paths)
+    seconds = time.perf_counter() - started
+
+    overall = analytics.overall.to_dict()
+    print(f"{overall['rounds']} rounds read in {seconds:.2f} s ({overall['rounds'] / seconds if seconds else 0:.0f} rounds/s), "
+          f"{len(analytics.users)} users, {len(analytics.words)} words")
+    print(f"solve rate {overall['solve_rate']:.1f}%, mean guesses {overall['mean_guesses']:.2f}, "
+          f"mean time {overall['mean_elapsed']:.1f} s")
+    print('top users:')
+    for user, totals in analytics.top_users(args.top):
+        stats = totals.to_dict()
+        print(f"  {user}: {stats['total_score']} points in {stats['rounds']} rounds, best {stats['best_score']}, "
+              f"solve rate {stats['solve_rate']:.1f}%")
+    print(f'hardest words (at least {args.min_rounds} rounds):')
+    for word, totals in analytics.hardest_words(args.top, args.min_rounds):
+        stats = totals.to_dict()
+        print(f"  {word}: solve rate {stats['solve_rate']:.1f}% over {stats['rounds']} rounds, "
+              f"mean guesses {stats['mean_guesses']:.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'overall': overall,
+                       'users': {user: totals.to_dict() for user, totals in analytics.users.items()},
+                       'words': {word: totals.to_dict() for word, totals in analytics.words.items()}}, file, indent=2)
@@ -0,0 +1,242 @@
+# HTTP client for the Word Scramble API server.
+#
+# One ApiClient is owned by the App. It keeps a pooled keep-alive requests.Session so every
+# guess, hint and leaderboard call reuses an open connection instead of opening a new TCP
+# connection per request. All endpoints hang off a single configurable base URL.
+# Every request is timed and counted in an optional Telemetry (telemetry.py).
+
+import os
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# default server location, can be overridden with the SCRAMBLE_API_URL environment variable
+default_base_url = os.environ.get('SCRAMBLE_API_URL', 'http://localhost:3000')
+
+# (connect, read) timeouts in seconds for each endpoint
+default_timeout = (2, 5)
+endpoint_timeouts = {
+    '/': (1, 2),
+    '/session': (1, 2),
+    '/get-word': (2, 5),
+    '/prefetch-word': (2, 8),
+    '/check-word': (2, 3),
+    '/check-words': (2, 10),
+    '/accuracy': (2, 3),
+    '/hint-1': (2, 8),
+    '/hint-2': (2, 3),
+    '/hint-3': (2, 8),
+    '/get-solution': (2, 3),
+    '/get-leaderboard': (2, 5),
+    '/update-leaderboard': (2, 5),
+    '/finish-round': (2, 5),
+    '/round-stats': (2, 5),
+}
+
+
+# raised for every failed API call (connection problems, timeouts and non 200 responses)
+class ApiError(Exception):
+    pass
+
+
+# raised instead of sending a request while the circuit breaker (health.py) is open
+class CircuitOpen(ApiError):
+    pass
+
+
+# raised when the server no longer knows the session id (it expired or the server restarted). The round in play is
+# lost, start_session gets a new session
+class SessionExpired(ApiError):
+    pass
+
+
+# the server's 404 error for an unknown session id, other 404s (no words, no definitions) keep their meaning
+session_expired_error = 'Unknown or expired session.'
+
+# responses that mean the server is unreachable behind a proxy, they count against the circuit breaker
+unavailable_statuses = (502, 503, 504)
+
+
+class ApiClient:
+    def __init__(self, base_url=default_base_url, retries=2, backoff=0.2, pool_size=4, telemetry=None, breaker=None):
+        self.base_url = base_url.rstrip('/')
+        self.telemetry = telemetry
+        # optional CircuitBreaker (health.py), connection failures open it and calls then fail without a request
+        self.breaker = breaker
+
+        # only idempotent requests are retried, a repeated POST /check-word would count a guess twice
+        retry = Retry(total=retries, connect=retries, read=retries, backoff_factor=backoff,
+                      status_forcelist=(502, 503, 504), allowed_methods=frozenset(['GET']))
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        # last leaderboard seen, kept so unchanged leaderboards are not downloaded again
+        self.leaderboard_version = None
+        self.leaderboard_entries = []
+        self.leaderboard_text = ''
+
+    def _request(self, method, endpoint, expected=(200,), **kwargs):
+        timeout = endpoint_timeouts.get(endpoint, default_timeout)
+        started = time.perf_counter()
+        if self.breaker is not None and not self.breaker.allow():
+            self._record(endpoint, started, None, 'circuit_open')
+            raise CircuitOpen('The API server is unavailable.')
+        try:
+            response = self.session.request(method, self.base_url + endpoint, timeout=timeout, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self._record(endpoint, started, None, 'timeout' if isinstance(e, requests.exceptions.Timeout) else 'connection')
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise ApiError(f'Failed to connect to the API: {e}') from e
+        if self.breaker is not None:
+            if response.status_code in unavailable_statuses:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+        if response.status_code not in expected:
+            self._record(endpoint, started, response, f'status_{response.status_code}')
+            if response.status_code == 404 and self._session_expired(response):
+                raise SessionExpired('The API session expired.')
+            raise ApiError(f'Received status code {response.status_code} from the API.')
+        self._record(endpoint, started, response, None)
+        return response
+
+    def _session_expired(self, response):
+        if 'X-Session-Id' not in self.session.headers:
+            return False
+        try:
+            return response.json().get('error') == session_expired_error
+        except (ValueError, AttributeError):
+            return False
+
+    def _record(self, endpoint, started, response, error):
+        if self.telemetry is None:
+            return
+        bytes_sent = bytes_received = 0
+        if response is not None:
+            body = response.request.body
+            bytes_sent = len(body) if body else 0
+            bytes_received = len(response.content)
+        self.telemetry.record_request(endpoint, time.perf_counter() - started, bytes_sent, bytes_received, error)
+
+    def _json(self, response):
+        try:
+            return response.json()
+        except ValueError as e:
+            if self.telemetry is not None:
+                self.telemetry.record_error(response.url[len(self.base_url):].split('?')[0], 'invalid_response')
+            raise ApiError(f'Invalid response from the API: {e}') from e
+
+# connection reuse counters summed over every pooled connection
+    def connection_stats(self):
+        connections = 0
+        requests_sent = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+        return {'requests': requests_sent,
+                'connections': connections,
+                'reused': max(requests_sent - connections, 0)}
+
+    def close(self):
+        self.session.close()
+
+# server status check
+    def ping(self):
+        self._request('GET', '/')
+        return True
+
+# starts a new server session (fresh round, complete and accuracy counters), its id is sent with every later call
+    def start_session(self):
+        self.session.headers.pop('X-Session-Id', None)
+        session_id = self._json(self._request('GET', '/session'))['session']
+        self.session.headers['X-Session-Id'] = session_id
+        return session_id
+
+# returns a scrambled word with the requested number of letters, a prefetch token starts that prefetched word instead.
+# difficulty (easy, medium, hard or 0 to 1) picks a word rated near that difficulty
+    def get_word(self, letters, token=None, difficulty=None):
+        data = {'letters': letters}
+        if token is not None:
+            data['token'] = token
+        if difficulty is not None:
+            data['difficulty'] = difficulty
+        return self._json(self._request('POST', '/get-word', data=data))['word']
+
+# returns the next round's {token, word} without starting it, its round clock starts now
+    def prefetch_word(self, letters, difficulty=None):
+        data = {'letters': letters}
+        if difficulty is not None:
+            data['difficulty'] = difficulty
+        return self._json(self._request('POST', '/prefetch-word', data=data))
+
+# returns the check result dictionary {result, score: {code, similarity}} for a guess
+    def check_word(self, word):
+        return self._json(self._request('POST', '/check-word', data={'word': word}))
+
+# checks many guesses in one request. Returns {correct, results}: correct is the index of the first correct guess
+# (-1 if none), results has one [code, similarity %] pair per guess (None for a guess of the wrong length)
+    def check_words(self, words):
+        return self._json(self._request('POST', '/check-words', json={'words': list(words)}))
+
+# returns the completion, round accuracy and game accuracy percentages
+    def accuracy(self, guess_attempts):
+        return self._json(self._request('POST', '/accuracy', data={'guess_attempts': guess_attempts}))
+
+    def hint1(self):
+        return self._json(self._request('GET', '/hint-1'))['partOfSpeech']
+
+    def hint2(self):
+        return self._request('GET', '/hint-2').text
+
+    def hint3(self):
+        return self._json(self._request('GET', '/hint-3'))['definition']
+
+    def get_solution(self):
+        return self._request('GET', '/get-solution').text
+
+# returns the formatted leaderboard text ("1. name, score" per line). The request is conditional on the last version
+# seen: an unchanged leaderboard is a 304 with no body, and a changed one usually comes back as a delta of new entries
+    def get_leaderboard(self):
+        headers = {}
+        params = {}
+        if self.leaderboard_version is not None:
+            headers['If-None-Match'] = f'"{self.leaderboard_version}"'
+            params['since'] = self.leaderboard_version
+        response = self._request('GET', '/get-leaderboard', expected=(200, 304), headers=headers, params=params)
+        if response.status_code == 304:
+            return self.leaderboard_text
+
+        data = self._json(response)
+        entries = [(entry['name'], entry['score']) for entry in data['entries']]
+        if data['delta']:
+            # new entries rank below older ones with the same score, sort() is stable
+            entries = self.leaderboard_entries + entries
+            entries.sort(key=lambda entry: entry[1], reverse=True)
+        self.leaderboard_entries = entries[:data['topN']]
+        self.leaderboard_version = data['version']
+        self.leaderboard_text = '\n'.join(f'{rank}. {name}, {score}' for rank, (name, score) in enumerate(self.leaderboard_entries, 1))
+        return self.leaderboard_text
+
+# puts the session's last solved round on the leaderboard. The server uses the score it computed, not this one
+    def update_leaderboard(self, username, score=None):
+        return self._json(self._request('POST', '/update-leaderboard', json={'username': username, 'newScore': score}))
+
+# returns totals over every round played on the server (rounds, solve rate, mean guesses, time and score, hints used)
+    def round_stats(self):
+        return self._json(self._request('GET', '/round-stats'))
+
+# ends the round in one request. Returns the solution, accuracy %, server computed score and the updated leaderboard.
+# elapsed and hints are only the client's score prediction, the server scores the round from its own clock and hint record
+    def finish_round(self, guess_attempts, elapsed=None, hints=None, username=''):
+        data = {'guess_attempts': guess_attempts, 'username': username}
+        if elapsed is not None:
+            data.update(elapsed=elapsed, hints=list(hints or []))
+        return self._json(self._request('POST', '/finish-round', json=data))
@@ -0,0 +1,111 @@
+# Background work for the GUI.
+#
+# Tk is single threaded, so anything that blocks (HTTP round-trips to the API server) runs on a
+# worker thread and its result is handed back to the Tk thread through self.after. The
+# StallMonitor measures how late the Tk event loop runs its scheduled callbacks, which is how
+# long the window was frozen. The RoundTimer shows the round clock kept by GameState and only
+# wakes the event loop when the displayed second changes.
+
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskRunner:
+    # workers=1 keeps game calls in submission order (a guess is never checked before its word arrives)
+    def __init__(self, widget, workers=1, poll_ms=15):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+        self.results = queue.SimpleQueue()
+        self.widget.after(self.poll_ms, self._drain)
+
+# runs fn(*args) on a worker thread, on_done(result) or on_error(exception) is then called on the Tk thread
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self.results.put((f, on_done, on_error)))
+        return future
+
+    def _drain(self):
+        while True:
+            try:
+                future, on_done, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            error = future.exception()
+            if error is not None:
+                if on_error is not None:
+                    on_error(error)
+                else:
+                    print(f'Error: {error}')
+            elif on_done is not None:
+                on_done(future.result())
+        self.widget.after(self.poll_ms, self._drain)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class StallMonitor:
+    # every heartbeat's delay is also recorded in telemetry (telemetry.py) when one is given
+    def __init__(self, widget, interval_ms=50, telemetry=None):
+        self.widget = widget
+        self.telemetry = telemetry
+        self.interval = interval_ms / 1000
+        self.max_stall = 0.0
+        self.expected = None
+
+    def start(self):
+        self.expected = time.perf_counter() + self.interval
+        self.widget.after(int(self.interval * 1000), self._tick)
+
+# a heartbeat that should fire every interval, any extra delay is time the event loop was blocked
+    def _tick(self):
+        now = time.perf_counter()
+        stall = now - self.expected
+        if stall > self.max_stall:
+            self.max_stall = stall
+        if self.telemetry is not None:
+            self.telemetry.record_stall(stall)
+        self.expected = now + self.interval
+        self.widget.after(int(self.interval * 1000), self._tick)
+
+# returns the largest stall (seconds) since the last reset, called once per round
+    def reset(self):
+        max_stall = self.max_stall
+        self.max_stall = 0.0
+        return max_stall
+
+
+class RoundTimer:
+    # shows the round clock of elapsed() (GameState.elapsed), on_tick(seconds) is called on the Tk thread each time the
+    # whole number of elapsed seconds changes. The timer keeps no time of its own
+    def __init__(self, widget, elapsed, on_tick):
+        self.widget = widget
+        self.elapsed = elapsed
+        self.on_tick = on_tick
+        self.shown = None
+        self.after_id = None
+
+    def start(self):
+        self.cancel()
+        self.shown = None
+        self._tick()
+
+    def stop(self):
+        self.cancel()
+
+    def cancel(self):
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+
+# redraws only on a new second, then sleeps until the next second boundary instead of polling
+    def _tick(self):
+        elapsed = self.elapsed()
+        seconds = int(elapsed)
+        if seconds != self.shown:
+            self.shown = seconds
+            self.on_tick(seconds)
+        delay = int((seconds + 1 - elapsed) * 1000) + 1
+        self.after_id = self.widget.after(delay, self._tick)
@@ -0,0 +1,63 @@
+# Benchmark for the anagram index: build time over the full word list, and the latency of anagram lookups and
+# guess checks on random scrambles. Also reports how many words of each length are ambiguous.
+#
+# Usage:
+#     python bench_anagrams.py [--words ../backendAPI/words.txt] [--builds 20] [--lookups 100000]
+
+import argparse
+import random
+import time
+
+from anagram_index import AnagramIndex
+from word_index import build_buckets, default_words_path
+
+
+# function to return the p-th percentile of a sorted list
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+# function to time fn(item) for every item, returns the sorted latencies in microseconds
+def time_calls(fn, items):
+    latencies = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+    return latencies
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time building and querying the anagram index.')
+    parser.add_argument('--words', default=default_words_path, help='word list')
+    parser.add_argument('--builds', type=int, default=20, help='index builds to time')
+    parser.add_argument('--lookups', type=int, default=100000, help='lookups to time')
+    args = parser.parse_args()
+
+    with open(args.words, 'r', encoding='utf-8') as file:
+        buckets = build_buckets(file)
+    total = sum(len(words) for words in buckets.values())
+
+    builds = []
+    for _ in range(args.builds):
+        started = time.perf_counter()
+        index = AnagramIndex.from_buckets(buckets)
+        builds.append(time.perf_counter() - started)
+    builds.sort()
+    print(f'build: {total} words, {len(index.groups)} signatures, median {builds[len(builds) // 2] * 1000:.2f} ms, '
+          f'best {builds[0] * 1000:.2f} ms')
+
+    rng = random.Random(1)
+    words = [word for bucket in buckets.values() for word in bucket]
+    solutions = [rng.choice(words) for _ in range(args.lookups)]
+    scrambles = [''.join(rng.sample(word, len(word))) for word in solutions]
+    for name, fn, items in (('anagrams', index.anagrams, scrambles),
+                            ('accepts', lambda pair: index.accepts(*pair), list(zip(scrambles, solutions)))):
+        latencies = time_calls(fn, items)
+        print(f'{name}: {len(items)} lookups, latency us: p50 {percentile(latencies, 50):.2f}, '
+              f'p99 {percentile(latencies, 99):.2f}, max {latencies[-1]:.2f}')
+
+    for length in sorted(buckets):
+        ambiguous = sum(1 for word in buckets[length] if index.is_ambiguous(word))
+        print(f'  {length} letters: {len(buckets[length])} words, {ambiguous} ambiguous')
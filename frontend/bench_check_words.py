@@ -0,0 +1,63 @@
+# Benchmark for guess checking: one /check-word request per guess against batched /check-words requests.
+# Both paths check the same guesses in one round and the results are compared, so the batch endpoint is also
+# checked against the single one.
+#
+# Usage:
+#     python bench_check_words.py [--url http://localhost:3000] [--local] [--guesses 5000] [--batch 500] [--letters 5]
+
+import argparse
+import random
+import time
+
+from api_client import ApiClient, default_base_url
+from engine import GameEngine
+from word_index import WordIndex
+
+
+# function to make wrong guesses from the scrambled word's letters (dictionary anagrams would solve the round)
+def make_guesses(scramble, solution, count, rng):
+    anagrams = WordIndex().anagrams
+    letters = list(scramble)
+    guesses = []
+    while len(guesses) < count:
+        rng.shuffle(letters)
+        guess = ''.join(letters)
+        if not anagrams.accepts(guess, solution):
+            guesses.append(guess)
+    return guesses
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare single and batched guess checking throughput.')
+    parser.add_argument('--url', default=default_base_url, help='API server to benchmark')
+    parser.add_argument('--local', action='store_true', help='use the in-process engine instead of a server')
+    parser.add_argument('--guesses', type=int, default=5000, help='guesses to check on each path')
+    parser.add_argument('--batch', type=int, default=500, help='guesses per /check-words request')
+    parser.add_argument('--letters', type=int, default=5, help='word length')
+    args = parser.parse_args()
+
+    backend = GameEngine() if args.local else ApiClient(args.url)
+    backend.start_session()
+    scramble = backend.get_word(args.letters)
+    # the server only shows the solution once the round is over, any dictionary anagram is checked the same way
+    solution = WordIndex().anagrams.anagrams(scramble)[0]
+    guesses = make_guesses(scramble, solution, args.guesses, random.Random(1))
+
+    started = time.perf_counter()
+    single = []
+    for guess in guesses:
+        score = backend.check_word(guess)['score']
+        single.append([score['code'], float(score['similarity'].rstrip('%'))])
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batched = []
+    for i in range(0, len(guesses), args.batch):
+        batched.extend(backend.check_words(guesses[i:i + args.batch])['results'])
+    batch_seconds = time.perf_counter() - started
+
+    backend.close()
+    print(f'single:  {len(guesses)} guesses in {single_seconds:.2f} s ({len(guesses) / single_seconds:.0f} guesses/s)')
+    print(f'batched: {len(guesses)} guesses in {batch_seconds:.2f} s ({len(guesses) / batch_seconds:.0f} guesses/s), '
+          f'{args.batch} per request, {single_seconds / batch_seconds:.1f}x faster')
+    print('results match' if single == batched else 'RESULTS DIFFER')
@@ -0,0 +1,83 @@
+# Startup benchmark for the App. Every measurement runs in a fresh interpreter, so nothing is cached in sys.modules.
+#
+#   import      time to import main.py (what has to load before the window can be built)
+#   backend     time to import the backend modules, which load_backend now does on the worker thread after the first frame
+#   first frame time from interpreter start to the window's first Expose event, and to the backend being ready
+#               (needs a display, skipped without one)
+#
+# Usage:
+#     python bench_startup.py [--runs 5] [--server-down]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+import_child = '''
+import time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+import api_client, engine, prefetch
+print(imported - started, time.perf_counter() - imported)
+'''
+
+frame_child = '''
+import time
+started = time.perf_counter()
+import main
+times = {}
+
+app = main.App()
+backend_ready = app.backend_ready
+
+def ready(backend):
+    backend_ready(backend)
+    times['backend'] = time.perf_counter() - started
+    app.after(0, app.destroy)
+
+def exposed(event):
+    times.setdefault('frame', time.perf_counter() - started)
+
+app.backend_ready = ready
+app.bind('<Expose>', exposed, add='+')
+app.after(10000, app.destroy)
+app.mainloop()
+print(times.get('frame', -1), times.get('backend', -1))
+'''
+
+
+# function to run one child script and return the numbers it prints
+def run_child(code, env):
+    output = subprocess.run([sys.executable, '-c', code], cwd=here, env=env, capture_output=True, text=True, check=True)
+    return [float(value) for value in output.stdout.split()[-2:]]
+
+
+def describe(values):
+    return f'median {statistics.median(values) * 1000:.0f} ms (min {min(values) * 1000:.0f}, max {max(values) * 1000:.0f})'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the App\'s imports and its first frame.')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per measurement')
+    parser.add_argument('--server-down', action='store_true', help='point the App at a port nothing listens on')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.server_down:
+        env['SCRAMBLE_API_URL'] = 'http://127.0.0.1:9'
+
+    imports = [run_child(import_child, env) for _ in range(args.runs)]
+    print(f'import main: {describe([main for main, _ in imports])}')
+    print(f'backend modules (loaded after the first frame): {describe([backend for _, backend in imports])}')
+
+    try:
+        frames = [run_child(frame_child, env) for _ in range(args.runs)]
+    except subprocess.CalledProcessError as e:
+        print(f'first frame: skipped, the window could not be opened ({e.stderr.strip().splitlines()[-1]})')
+        sys.exit(0)
+    print(f'first frame: {describe([frame for frame, _ in frames])}')
+    print(f'backend ready: {describe([backend for _, backend in frames])}')
@@ -0,0 +1,56 @@
+# Benchmark for the vectorized scorer: scores random targets against every dictionary word of the same length with
+# VectorScorer and with check_scrambled_word in a loop. Every result is compared, and the time per target is
+# reported for both, plus the vectorized pass alone (without building the result strings).
+#
+# Usage:
+#     python bench_vector_scorer.py [--targets 500] [--seed 1]
+
+import argparse
+import random
+import time
+
+from engine import check_scrambled_word
+from vector_scorer import VectorScorer
+from word_index import WordIndex
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare vectorized and per-word guess scoring.')
+    parser.add_argument('--targets', type=int, default=500, help='targets to score against the dictionary')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for picking targets')
+    args = parser.parse_args()
+
+    index = WordIndex()
+    started = time.perf_counter()
+    scorer = VectorScorer.from_word_index(index)
+    print(f'build: {sum(len(words) for words in scorer.words.values())} words in {len(scorer.matrices)} matrices, '
+          f'{(time.perf_counter() - started) * 1000:.1f} ms')
+
+    rng = random.Random(args.seed)
+    words = [word for bucket in index.buckets.values() for word in bucket]
+    targets = [rng.choice(words) for _ in range(args.targets)]
+
+    vector_seconds = loop_seconds = pass_seconds = 0.0
+    scored = mismatches = 0
+    for target in targets:
+        started = time.perf_counter()
+        vector = scorer.score(target)
+        vector_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        scorer.similarities(target)
+        pass_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        loop = {word: check_scrambled_word(word, target) for word in scorer.words[len(target)]}
+        loop_seconds += time.perf_counter() - started
+
+        scored += len(loop)
+        mismatches += sum(1 for word, result in loop.items() if vector[word] != result)
+
+    print(f'vectorized: {vector_seconds / len(targets) * 1000:.3f} ms per target, '
+          f'{scored / vector_seconds:.0f} words/s')
+    print(f'vectorized pass only (masks and similarity, no strings): {pass_seconds / len(targets) * 1000:.3f} ms per target, '
+          f'{scored / pass_seconds:.0f} words/s')
+    print(f'loop:       {loop_seconds / len(targets) * 1000:.3f} ms per target, {scored / loop_seconds:.0f} words/s')
+    print(f'{scored} results compared, {mismatches} differ')
+    print(f'near misses for {targets[0]!r}: {scorer.near_misses(targets[0], 5)}')
@@ -0,0 +1,80 @@
+# Benchmark for the binary word list: writes a synthetic list of N random words as words.txt and words.bin,
+# then compares loading the text file (build_buckets, what WordIndex does) with opening the binary file
+# (word_file.py), and times random picks and lookups on the mapped file.
+#
+# Usage:
+#     python bench_word_file.py [--words 2000000] [--seed 1]
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+import tracemalloc
+
+from build_words import build
+from word_file import WordFile
+from word_index import build_buckets
+
+
+# function to time fn() and return (result, seconds)
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+# function to return the peak memory allocated while fn() runs in MiB (a separate run, tracemalloc slows it down)
+def peak_memory(fn):
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def load_text(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return build_buckets(file)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare the text and binary word list loaders.')
+    parser.add_argument('--words', type=int, default=2000000, help='synthetic words to generate')
+    parser.add_argument('--seed', type=int, default=1, help='random seed')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, 'words.txt')
+        binary_path = os.path.join(directory, 'words.bin')
+        with open(text_path, 'w', encoding='utf-8') as file:
+            for _ in range(args.words):
+                file.write(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 12))) + '\n')
+        (total, _, size), seconds = timed(lambda: build(text_path, binary_path))
+        print(f'{args.words} words: words.txt {os.path.getsize(text_path)} bytes, '
+              f'words.bin {size} bytes ({total} unique), built in {seconds:.2f} s')
+
+        buckets, seconds = timed(lambda: load_text(text_path))
+        del buckets
+        print(f'text load: {seconds * 1000:.0f} ms, peak {peak_memory(lambda: load_text(text_path)):.0f} MiB')
+
+        words, seconds = timed(lambda: WordFile(binary_path))
+        print(f'binary open: {seconds * 1000:.3f} ms, peak {peak_memory(lambda: WordFile(binary_path)):.3f} MiB')
+
+        picks = 200000
+        started = time.perf_counter()
+        for _ in range(picks):
+            words.random_word(rng.randint(3, 12), rng)
+        seconds = time.perf_counter() - started
+        print(f'random word: {seconds / picks * 1e6:.2f} us per pick')
+
+        probes = [words.random_word(rng.randint(3, 12), rng) for _ in range(picks // 2)]
+        probes += [''.join(rng.choices(string.ascii_lowercase, k=len(word))) for word in probes]
+        started = time.perf_counter()
+        found = sum(1 for word in probes if word in words)
+        seconds = time.perf_counter() - started
+        print(f'lookup: {seconds / len(probes) * 1e6:.2f} us per word ({found} of {len(probes)} found)')
+        words.close()
@@ -0,0 +1,95 @@
+# Builds the local hint store (backendAPI/hints.tsv) from an offline dictionary dump.
+#
+# Supported dumps, detected per record:
+#   - dictionaryapi.dev entries: {"word": ..., "meanings": [{"partOfSpeech": ..., "definitions": [{"definition": ...}]}]}
+#     as a JSON array, as JSON lines, or one API response (a list of entries) per line
+#   - Wiktionary extracts (kaikki.org / wiktextract) as JSON lines: {"word": ..., "pos": ..., "senses": [{"glosses": [...]}]}
+#
+# Like the server's live lookup, the first meaning of the first entry for a word wins.
+# Every word in words.txt gets a line, words missing from the dump get empty fields.
+#
+# Usage:
+#     python build_hints.py dump.jsonl [--words ../backendAPI/words.txt] [--out ../backendAPI/hints.tsv]
+
+import argparse
+import json
+
+from hint_store import default_hints_path
+from word_index import default_words_path
+
+
+# function to yield dictionary records from a JSON array or JSON lines dump
+def read_records(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        first = file.read(1)
+        while first.isspace():
+            first = file.read(1)
+        file.seek(0)
+        if first == '[' and not file.readline().strip().endswith(']'):
+            # one JSON array spanning the whole file
+            file.seek(0)
+            records = json.load(file)
+        else:
+            file.seek(0)
+            records = (json.loads(line) for line in file if line.strip())
+        for record in records:
+            if isinstance(record, list):
+                yield from record
+            else:
+                yield record
+
+
+# function to return (word, part of speech, definition) from a dump record
+def parse_record(record):
+    word = record.get('word')
+    if not word:
+        return None
+    if 'meanings' in record:
+        for meaning in record['meanings'] or []:
+            definitions = meaning.get('definitions') or []
+            definition = definitions[0].get('definition', '') if definitions else ''
+            return word, meaning.get('partOfSpeech', ''), definition
+        return None
+    glosses = []
+    for sense in record.get('senses') or []:
+        glosses = sense.get('glosses') or []
+        if glosses:
+            break
+    return word, record.get('pos', ''), glosses[0] if glosses else ''
+
+
+# tabs and newlines would break the line format
+def clean(text):
+    return ' '.join(str(text).split())
+
+
+def build(dump_path, words_path, out_path):
+    with open(words_path, 'r', encoding='utf-8') as file:
+        words = {word.lower() for line in file for word in line.split()}
+
+    hints = {}
+    for record in read_records(dump_path):
+        parsed = parse_record(record)
+        if parsed is None:
+            continue
+        word = parsed[0].lower()
+        if word in words and word not in hints:
+            hints[word] = (clean(parsed[1]), clean(parsed[2]))
+
+    keys = sorted(words, key=lambda word: word.encode('utf-8'))
+    with open(out_path, 'w', encoding='utf-8', newline='\n') as file:
+        for word in keys:
+            part_of_speech, definition = hints.get(word, ('', ''))
+            file.write(f'{word}\t{part_of_speech}\t{definition}\n')
+    return len(keys), len(hints)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the local hint store from a dictionary dump.')
+    parser.add_argument('dump', help='dictionary dump file (JSON array or JSON lines)')
+    parser.add_argument('--words', default=default_words_path, help='word list to cover')
+    parser.add_argument('--out', default=default_hints_path, help='hint store to write')
+    args = parser.parse_args()
+
+    total, found = build(args.dump, args.words, args.out)
+    print(f'Wrote {total} words to {args.out} ({found} with hints, {total - found} missing from the dump)')
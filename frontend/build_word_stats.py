@@ -0,0 +1,90 @@
+# Builds the word stats table (backendAPI/word_stats.tsv) used for difficulty-rated word selection.
+#
+# For every word in words.txt:
+#   letter score  how common its letters are across the word list (mean letter frequency, 1 = the most common letter)
+#   anagrams      how many other dictionary words use the same letters
+#   plays, solves, guesses  totals from past rounds, read from round histories (backendAPI/rounds.jsonl, see
+#                 round_history.py) or any JSON lines with {"word": ..., "solved": true, "guesses": 3} per round
+#   difficulty    the word's rank among the words of its length, from 0 (easiest) to 1 (hardest)
+#
+# The rank comes from a score made of rare letters and anagrams. Once a word has been played, the score is blended
+# with its unsolved rate and guess count. The more rounds a word has been played, the more its history counts.
+#
+# Usage:
+#     python build_word_stats.py [--rounds rounds.jsonl ...] [--words ../backendAPI/words.txt] [--out ../backendAPI/word_stats.tsv]
+
+import argparse
+from collections import Counter
+
+from anagram_index import AnagramIndex
+from game_state import max_guesses
+from round_history import number, read_rounds
+from word_index import build_buckets, default_words_path
+from word_stats import default_stats_path
+
+# rounds of history that weigh as much as the letter/anagram estimate
+prior_rounds = 5
+
+
+# function to total plays, solves and guesses per word from round history files
+def read_history(paths):
+    history = {}
+    for record in read_rounds(paths):
+        word = record.get('word')
+        if not isinstance(word, str):
+            continue
+        totals = history.setdefault(word, [0, 0, 0])
+        totals[0] += 1
+        totals[1] += 1 if record.get('solved') else 0
+        totals[2] += number(record, 'guesses')
+    return history
+
+
+# function to return the raw difficulty score of one word (higher is harder, roughly 0 to 1)
+def difficulty_score(letter_score, anagrams, plays, solves, guesses):
+    estimate = 0.7 * (1 - letter_score) + 0.3 * min(anagrams, 3) / 3
+    if plays == 0:
+        return estimate
+    observed = 0.5 * (1 - solves / plays) + 0.5 * min(guesses / plays, max_guesses) / max_guesses
+    return (plays * observed + prior_rounds * estimate) / (plays + prior_rounds)
+
+
+def build(words_path, rounds_paths, out_path):
+    with open(words_path, 'r', encoding='utf-8') as file:
+        buckets = build_buckets(file)
+    anagrams = AnagramIndex.from_buckets(buckets)
+    history = read_history(rounds_paths)
+
+    letters = Counter(char for words in buckets.values() for word in words for char in word.lower())
+    most_common = max(letters.values()) if letters else 1
+
+    rows = {}
+    for length, words in buckets.items():
+        scored = []
+        for word in dict.fromkeys(words):
+            letter_score = sum(letters[char] for char in word.lower()) / len(word) / most_common
+            plays, solves, guesses = history.get(word, (0, 0, 0))
+            others = len(anagrams.anagrams(word)) - 1
+            scored.append((difficulty_score(letter_score, others, plays, solves, guesses), word,
+                           letter_score, others, plays, solves, guesses))
+        scored.sort()
+        for rank, (_, word, letter_score, others, plays, solves, guesses) in enumerate(scored):
+            difficulty = rank / (len(scored) - 1) if len(scored) > 1 else 0.5
+            rows[word] = (letter_score, others, plays, solves, guesses, difficulty)
+
+    with open(out_path, 'w', encoding='utf-8', newline='\n') as file:
+        for word in sorted(rows):
+            letter_score, others, plays, solves, guesses, difficulty = rows[word]
+            file.write(f'{word}\t{letter_score:.3f}\t{others}\t{plays}\t{solves}\t{guesses}\t{difficulty:.3f}\n')
+    return len(rows), sum(1 for word in rows if word in history)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the per-word stats table for difficulty-rated word selection.')
+    parser.add_argument('--rounds', nargs='*', default=[], help='round results files (JSON lines)')
+    parser.add_argument('--words', default=default_words_path, help='word list to rate')
+    parser.add_argument('--out', default=default_stats_path, help='stats table to write')
+    args = parser.parse_args()
+
+    total, played = build(args.words, args.rounds, args.out)
+    print(f'Wrote {total} words to {args.out} ({played} with round history)')
@@ -0,0 +1,38 @@
+# Compiles words.txt into the binary word list (backendAPI/words.bin) read by word_file.py.
+#
+# Words are split like the server splits them (whitespace separated, one or more per line), then lowercased,
+# deduplicated, bucketed by length and sorted. Words with non-ASCII letters can't be fixed-width records and are
+# skipped (the count is printed).
+#
+# Usage:
+#     python build_words.py [--words ../backendAPI/words.txt] [--out ../backendAPI/words.bin]
+
+import argparse
+
+from word_file import default_word_file_path, write_word_file
+from word_index import build_buckets, default_words_path
+
+
+def build(words_path, out_path):
+    with open(words_path, 'r', encoding='utf-8') as file:
+        buckets = build_buckets(file)
+    unique = {}
+    skipped = 0
+    for words in buckets.values():
+        for word in words:
+            if not word.isascii():
+                skipped += 1
+                continue
+            unique.setdefault(len(word), set()).add(word.lower())
+    size = write_word_file(out_path, {length: sorted(words) for length, words in unique.items()})
+    return sum(len(words) for words in unique.values()), skipped, size
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compile the word list into the memory-mappable binary format.')
+    parser.add_argument('--words', default=default_words_path, help='word list to compile')
+    parser.add_argument('--out', default=default_word_file_path, help='binary word list to write')
+    args = parser.parse_args()
+
+    total, skipped, size = build(args.words, args.out)
+    print(f'Wrote {total} words ({size} bytes) to {args.out}' + (f', skipped {skipped} non-ASCII words' if skipped else ''))
@@ -0,0 +1,290 @@
+# In-process game engine, a pure Python port of the API server's game logic.
+#
+# GameEngine has the same methods as ApiClient, so the App can use either one as its backend. Running the engine
+# in-process removes the HTTP round-trip from every guess and lets the game run on a kiosk without the Node server.
+# Hints 1 and 3 come from the local hint store (hints.tsv). Without it they are looked up on dictionaryapi.dev and
+# cached, like the server's lookupHints. Set SCRAMBLE_BACKEND=local to use it.
+
+import os
+import random
+import threading
+import time
+import uuid
+
+import requests
+
+from api_client import ApiError
+from hint_store import HintStore, default_hints_path
+from leaderboard_store import LeaderboardStore
+from round_history import RoundHistory, default_rounds_path
+from running_stats import RunningStats
+from scoring import compute_score
+from word_index import WordIndex, default_words_path
+from word_stats import parse_difficulty
+
+default_leaderboard_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backendAPI', 'leaderboard.txt')
+
+# rounds covered by the recent accuracy mean
+accuracy_window = 10
+
+dictionary_url = 'https://api.dictionaryapi.dev/api/v2/entries/en/'
+# (connect, read) timeouts in seconds for a dictionary lookup, the same as the hint endpoints'
+dictionary_timeout = (2, 8)
+
+
+# function that takes the solution and randomizes the letter positions
+def scramble_word(word, rng=random):
+    # a word made of one repeated letter can't be scrambled
+    if len(set(word)) < 2:
+        return word
+    chars = list(word)
+    while True:
+        rng.shuffle(chars)
+        scrambled = ''.join(chars)
+        if scrambled != word:
+            return scrambled
+
+
+# function to return both the position data, and the similarity % for our guess and solution
+def check_scrambled_word(guess, solution):
+    if len(guess) != len(solution):
+        return "Input words have different lengths"
+    code = ''.join('*' if g == s else '-' for g, s in zip(guess, solution))
+    similarity = code.count('*') / len(solution) * 100
+    return {'code': code, 'similarity': f'{similarity:.2f}%'}
+
+
+# function to validate a round's guess count (at least 1), like the server's 400 for invalid request data
+def parse_attempts(guess_attempts):
+    try:
+        attempts = int(guess_attempts)
+    except (TypeError, ValueError):
+        raise ApiError('Invalid request data.') from None
+    if attempts < 1:
+        raise ApiError('Invalid request data.')
+    return attempts
+
+
+# function to return the compact [position code, similarity %] of a guess, None if the lengths differ
+def score_guess(guess, solution):
+    if len(guess) != len(solution):
+        return None
+    code = ''.join('*' if g == s else '-' for g, s in zip(guess, solution))
+    return [code, round(code.count('*') / len(solution) * 100, 2)]
+
+
+class GameEngine:
+    def __init__(self, words_path=default_words_path, leaderboard_path=default_leaderboard_path, hints_path=default_hints_path,
+                 top_n=10, rng=None, rounds_path=default_rounds_path, clock=time.monotonic):
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.words = WordIndex(words_path, rng=self.rng)
+        self.hints = HintStore(hints_path)
+        # dictionaryapi.dev results by word (None for a word it has no entry for), used when there is no hints.tsv
+        self.dictionary_cache = {}
+        self.leaderboard = LeaderboardStore(leaderboard_path, top_n=top_n)
+        # None keeps rounds out of the shared history (benchmarks and simulations)
+        self.history = RoundHistory(rounds_path) if rounds_path else None
+        self.current_word = ''
+        self.scramble = ''
+        self.pending_rounds = {}
+        self.max_pending_rounds = 16
+        self.lock = threading.Lock()
+        # rounds finished with a client score prediction, and how many predictions did not match the engine's score
+        self.score_checks = {'predicted': 0, 'mismatched': 0}
+        self.start_session()
+
+    def close(self):
+        pass
+
+    def ping(self):
+        return True
+
+# resets the round, complete and accuracy counters
+    def start_session(self):
+        self.round = 0
+        self.complete = 0
+        self.solved = False
+        self.accuracy_stats = RunningStats(accuracy_window)
+        self.start_round()
+        # no round has been started yet, so there is nothing to finish
+        self.finished = True
+        return "Operational"
+
+# the engine's own record of the current round, the score is computed from these like the server does. A prefetched
+# round's clock started when its scramble was handed out
+    def start_round(self, started=None):
+        self.round_started = self.clock() if started is None else started
+        self.solved_at = None
+        self.hints_used = set()
+        # score of the last solved round that has not been put on the leaderboard yet
+        self.unclaimed_score = None
+        # set by finish_round, a round is only finished once
+        self.finished = False
+
+    def mark_solved(self):
+        if not self.solved:
+            self.complete += 1
+            self.solved = True
+            self.solved_at = self.clock()
+
+    def get_word(self, letters, token=None, difficulty=None):
+        with self.lock:
+            pending = self.pending_rounds.pop(token, None)
+        started = None
+        if pending is not None:
+            self.current_word, self.scramble, started = pending
+        else:
+            target = self.words.random_word(letters, self.difficulty(difficulty))
+            if target is None:
+                raise ApiError('No words with that many letters.')
+            self.current_word = target
+            self.scramble = scramble_word(target, self.rng)
+        self.solved = False
+        self.round += 1
+        self.start_round(started)
+        return self.scramble
+
+# picks the next round's word without starting it, get_word(letters, token) starts it. The round clock runs from now
+# and hints are not included, like the server's /prefetch-word
+    def prefetch_word(self, letters, difficulty=None):
+        target = self.words.random_word(letters, self.difficulty(difficulty))
+        if target is None:
+            raise ApiError('No words with that many letters.')
+        token = uuid.uuid4().hex
+        scramble = scramble_word(target, self.rng)
+        with self.lock:
+            self.pending_rounds[token] = (target, scramble, self.clock())
+            if len(self.pending_rounds) > self.max_pending_rounds:
+                del self.pending_rounds[next(iter(self.pending_rounds))]
+        return {'token': token, 'word': scramble}
+
+# any dictionary anagram of the word solves the round ("post" for "stop"), it then becomes the round's solution
+    def check_word(self, word):
+        self.check_guessing([word])
+        if self.words.anagrams.accepts(word, self.current_word):
+            self.current_word = word
+        score = check_scrambled_word(word, self.current_word)
+        if word == self.current_word:
+            self.mark_solved()
+            return {'result': 'correct', 'score': score}
+        return {'result': 'incorrect', 'score': score}
+
+# guesses are only taken while a round is running, like the server's 409
+    def check_guessing(self, words):
+        if not all(isinstance(word, str) and word for word in words):
+            raise ApiError('Invalid request data.')
+        if self.finished:
+            raise ApiError('No round is running.')
+
+    def difficulty(self, value):
+        try:
+            return parse_difficulty(value)
+        except ValueError as e:
+            raise ApiError(str(e)) from e
+
+    def check_words(self, words):
+        words = list(words)
+        self.check_guessing(words)
+        anagrams = self.words.anagrams
+        correct = next((i for i, word in enumerate(words) if anagrams.accepts(word, self.current_word)), -1)
+        if correct != -1:
+            self.current_word = words[correct]
+            self.mark_solved()
+        return {'correct': correct, 'results': [score_guess(word, self.current_word) for word in words]}
+
+    def accuracy(self, guess_attempts):
+        guess_attempts = parse_attempts(guess_attempts)
+        completion = self.complete / self.round * 100 if self.round else 0
+        round_accuracy = 1 / guess_attempts * 100
+        self.accuracy_stats.add(round_accuracy)
+        return {'completion': completion, 'round_accuracy': round_accuracy, 'game_accuracy': self.accuracy_stats.mean,
+                'accuracy_stats': self.accuracy_stats.to_dict()}
+
+# returns (part of speech, definition) for a word from the hint store, or from dictionaryapi.dev (cached) without one
+    def lookup_hints(self, word):
+        if self.hints.available():
+            return self.hints.lookup(word)
+        if word not in self.dictionary_cache:
+            try:
+                response = requests.get(dictionary_url + word, timeout=dictionary_timeout)
+            except requests.exceptions.RequestException as e:
+                raise ApiError(f'Failed to connect to the dictionary: {e}') from e
+            hints = None
+            if response.status_code == 200:
+                try:
+                    entries = response.json()
+                    meaning = entries[0]['meanings'][0]
+                    definitions = meaning.get('definitions') or [{}]
+                    hints = (meaning.get('partOfSpeech') or '', definitions[0].get('definition') or '')
+                except (ValueError, LookupError, TypeError, AttributeError):
+                    hints = None
+            elif response.status_code != 404:
+                raise ApiError(f'Received status code {response.status_code} from the dictionary.')
+            self.dictionary_cache[word] = hints
+        return self.dictionary_cache[word]
+
+    def hint1(self):
+        self.hints_used.add(1)
+        entry = self.lookup_hints(self.current_word)
+        if not entry or not entry[0]:
+            raise ApiError('No meanings found for the word.')
+        return entry[0]
+
+    def hint2(self):
+        self.hints_used.add(2)
+        return self.current_word[:1]
+
+    def hint3(self):
+        self.hints_used.add(3)
+        entry = self.lookup_hints(self.current_word)
+        if not entry or not entry[1]:
+            raise ApiError('No definitions found for the word.')
+        return entry[1]
+
+    def get_solution(self):
+        if not self.solved and not self.finished:
+            raise ApiError('The solution is only shown once the round is over.')
+        return self.current_word
+
+    def round_stats(self):
+        if self.history is None:
+            raise ApiError('No round history.')
+        return dict(self.history.summary(), score_checks=dict(self.score_checks))
+
+    def get_leaderboard(self):
+        return self.leaderboard.text()
+
+# puts the last solved round's score on the leaderboard, the score argument is ignored like the server's newScore
+    def update_leaderboard(self, username, score=None):
+        if not username:
+            raise ApiError('Invalid request data.')
+        if self.unclaimed_score is None:
+            raise ApiError('No finished round to submit.')
+        score, self.unclaimed_score = self.unclaimed_score, None
+        self.leaderboard.submit(username, score)
+        return {'message': 'Leaderboard updated successfully.', 'score': score}
+
+# elapsed and hints are the client's prediction, the score comes from the engine's round clock and hint record
+    def finish_round(self, guess_attempts, elapsed=None, hints=None, username=''):
+        guess_attempts = parse_attempts(guess_attempts)
+        if self.finished:
+            raise ApiError('The round is already finished.')
+        self.finished = True
+        results = self.accuracy(guess_attempts)
+        seconds = ((self.solved_at if self.solved else self.clock()) - self.round_started)
+        hints_used = sorted(self.hints_used)
+        score = 0
+        if self.solved:
+            score = self.unclaimed_score = compute_score(len(self.current_word), seconds, hints_used)
+            if username:
+                self.update_leaderboard(username)
+            if elapsed is not None:
+                self.score_checks['predicted'] += 1
+                if compute_score(len(self.current_word), float(elapsed), hints or []) != score:
+                    self.score_checks['mismatched'] += 1
+        if self.history is not None:
+            self.history.record(username, self.current_word, self.solved, int(guess_attempts), seconds, hints_used, score)
+        results.update({'solution': self.current_word, 'complete': self.solved, 'score': score,
+                        'leaderboard': self.get_leaderboard()})
+        return results
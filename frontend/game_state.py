@@ -0,0 +1,106 @@
+# Headless game state, the round logic of the App without any widgets.
+#
+# GameState tracks one player's round: the scrambled word, the guess count and board row, whether a guess is being
+# checked, the hints used and the round clock. It never calls the backend itself, the caller sends the guesses and
+# feeds the check results back in. The App does that on its worker thread, simulate.py does it inline.
+
+import time
+
+max_guesses = 8
+
+# submit_guess results
+wrong_length = 'wrong_length'
+ignored = 'ignored'
+check = 'check'
+
+# guess_checked results
+correct = 'correct'
+incorrect = 'incorrect'
+out_of_guesses = 'out_of_guesses'
+
+
+class GameState:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.word = ''
+        self.running = False
+        self.checking = False
+        self.complete = False
+        self.guess_number = 0
+        self.count = 1
+        self.last_row = None
+        self.valid_length = False
+        self.position_data = ''
+        self.similarity = ''
+        self.hints = set()
+        self.started = None
+        self.stopped = None
+
+# starts a round with the scrambled word from the backend, started is the clock time a prefetched word arrived
+    def begin_round(self, word, started=None):
+        self.word = word
+        self.running = True
+        self.checking = False
+        self.complete = False
+        self.guess_number = 0
+        self.count = 1
+        self.last_row = None
+        self.valid_length = False
+        self.hints = set()
+        self.started = self.clock() if started is None else started
+        self.stopped = None
+
+# the backend swapped in a different word (an expired prefetch), the round keeps its clock and guesses
+    def replace_word(self, word):
+        self.word = word
+
+    def use_hint(self, hint):
+        self.hints.add(hint)
+
+    def hints_used(self):
+        return sorted(self.hints)
+
+# returns check if the guess should be sent to the backend, wrong_length or ignored (no round, or a check pending)
+    def submit_guess(self, guess):
+        if len(guess) != len(self.word):
+            self.valid_length = False
+            return wrong_length
+        self.valid_length = True
+        if not self.running or self.checking:
+            return ignored
+        self.checking = True
+        self.guess_number += 1
+        return check
+
+# applies the backend's check result, returns correct, incorrect or out_of_guesses (last_row is the guess's row)
+    def guess_checked(self, response):
+        self.checking = False
+        self.position_data = response['score']['code']
+        self.similarity = response['score']['similarity']
+        self.last_row = self.count
+        if response['result'] == correct:
+            self.complete = True
+            return correct
+        self.count += 1
+        if self.last_row >= max_guesses:
+            self.complete = False
+            return out_of_guesses
+        return incorrect
+
+# a guess that could not be checked does not use up one of the guesses
+    def guess_failed(self):
+        self.guess_number -= 1
+        self.checking = False
+
+# stops the round, returns the precise round time in seconds
+    def end_round(self):
+        if self.running:
+            self.running = False
+            self.stopped = self.clock()
+        return self.elapsed()
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        end = self.stopped if self.stopped is not None else self.clock()
+        return end - self.started
@@ -0,0 +1,107 @@
+# Circuit breaker and health monitor for the API server connection.
+#
+# ApiClient reports every request to the CircuitBreaker. After failure_threshold connection failures in a row the
+# breaker opens, or after the first one if no request has got through yet (the server is down at startup). Every call then fails straight away with CircuitOpen (api_client.py) instead of waiting for its own
+# connection timeout. While it is open the HealthMonitor probes GET / on its own thread, waiting longer after every
+# failed probe (backoff doubles up to max_backoff). A probe that gets through closes the breaker again. The App polls
+# the state to show it and to switch the game back on.
+
+import threading
+import time
+
+from api_client import ApiError
+
+closed = 'closed'
+open_ = 'open'
+# a probe is on its way, the next result decides between closed and open
+half_open = 'half_open'
+# no request has got through yet, the first failure opens the breaker
+connecting = 'connecting'
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=3):
+        self.failure_threshold = failure_threshold
+        self.condition = threading.Condition()
+        self.state = connecting
+        self.failures = 0
+        # the one request let through while half open is on its way
+        self.probing = False
+
+# half open lets a single request through as the probe, the others fail fast until its result is in
+    def allow(self):
+        with self.condition:
+            if self.state == open_:
+                return False
+            if self.state == half_open:
+                if self.probing:
+                    return False
+                self.probing = True
+            return True
+
+    def record_success(self):
+        with self.condition:
+            self.failures = 0
+            self.probing = False
+            self.state = closed
+
+    def record_failure(self):
+        with self.condition:
+            self.failures += 1
+            self.probing = False
+            if self.state in (half_open, connecting) or self.failures >= self.failure_threshold:
+                self.state = open_
+                self.condition.notify_all()
+
+# lets the next request through to find out whether the server is back
+    def half_open(self):
+        with self.condition:
+            if self.state == open_:
+                self.state = half_open
+                self.probing = False
+
+# blocks until the breaker is open, returns False if it was still closed after timeout seconds
+    def wait_open(self, timeout=None):
+        with self.condition:
+            return self.condition.wait_for(lambda: self.state == open_, timeout)
+
+
+class HealthMonitor:
+    def __init__(self, breaker, probe, backoff=0.5, max_backoff=10.0):
+        self.breaker = breaker
+        self.probe = probe
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # monotonic time of the next probe while the breaker is open, None otherwise
+        self.next_probe = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='health', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            if not self.breaker.wait_open(timeout=1.0):
+                continue
+            delay = self.backoff
+            while self.breaker.state == open_:
+                self.next_probe = time.monotonic() + delay
+                if self.stopped.wait(delay):
+                    return
+                self.breaker.half_open()
+                try:
+                    self.probe()
+                except ApiError:
+                    pass
+                delay = min(delay * 2, self.max_backoff)
+            self.next_probe = None
+
+# seconds until the next probe, None when no probe is scheduled
+    def retry_in(self):
+        next_probe = self.next_probe
+        return None if next_probe is None else max(next_probe - time.monotonic(), 0.0)
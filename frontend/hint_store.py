@@ -0,0 +1,67 @@
+# Local dictionary store for the speech type (hint 1) and definition (hint 3) hints.
+#
+# hints.tsv has one "word<TAB>part of speech<TAB>definition" line for every word in words.txt, sorted by word.
+# The file is memory-mapped on first use and looked up with a binary search over its lines, so nothing is parsed
+# up front and several processes share the same pages. Build it with build_hints.py. Whether the file exists is checked
+# once when the store is created.
+
+import mmap
+import os
+
+default_hints_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backendAPI', 'hints.tsv')
+
+
+class HintStore:
+    def __init__(self, path=default_hints_path):
+        self.path = path
+        self.data = None
+        self.exists = os.path.exists(path)
+
+    def available(self):
+        return self.exists
+
+    def _open(self):
+        with open(self.path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                self.data = b''
+            else:
+                self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+# returns (part of speech, definition) for a word, or None if the store has no hints for it
+    def lookup(self, word):
+        if self.data is None:
+            self._open()
+        data = self.data
+        key = word.lower().encode('utf-8')
+        lo, hi = 0, len(data)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = data.rfind(b'\n', lo, mid) + 1 or lo
+            end = data.find(b'\n', start, hi)
+            if end == -1:
+                end = hi
+            line = data[start:end]
+            line_key = line.split(b'\t', 1)[0]
+            if line_key < key:
+                lo = end + 1
+            elif line_key > key:
+                hi = start
+            else:
+                _, part_of_speech, definition = line.decode('utf-8').split('\t')
+                if not part_of_speech and not definition:
+                    return None
+                return part_of_speech, definition
+        return None
+
+    def part_of_speech(self, word):
+        entry = self.lookup(word)
+        return entry[0] if entry and entry[0] else None
+
+    def definition(self, word):
+        entry = self.lookup(word)
+        return entry[1] if entry and entry[1] else None
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = None
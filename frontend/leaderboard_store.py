@@ -0,0 +1,163 @@
+# Leaderboard storage engine, the Python twin of backendAPI/leaderboardStore.js.
+#
+# leaderboard.txt is an append-only log of "name, score" lines. In memory, the best top_n entries are kept in a
+# min-heap, so a submission costs O(log n), and the log is compacted back down to the top scores every compact_every
+# appends. The file format and the lock file protocol match the server's, so the server and in-process engines can
+# share one leaderboard file: every write happens under an exclusive lock file, and each writer picks up the others'
+# appends by reading the new tail of the log. Readers don't take the lock, so they only load up to the last newline:
+# anything after it may be a line another writer is still appending, and is read again next time.
+
+import heapq
+import os
+import time
+
+lock_timeout = 5.0
+stale_lock = 10.0
+
+
+# function to parse a "name, score" log line, returns None for blank or malformed lines
+def parse_line(line):
+    line = line.strip()
+    name, separator, score = line.rpartition(', ')
+    if not separator:
+        return None
+    try:
+        return name, int(score)
+    except ValueError:
+        return None
+
+
+class LeaderboardStore:
+    def __init__(self, path, top_n=10, compact_every=1000):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.top_n = top_n
+        self.compact_every = compact_every
+        self.stats = {'submissions': 0, 'compactions': 0, 'lock_waits': 0}
+        self.reset()
+        self.refresh()
+
+    def reset(self):
+        # heap items are (score, -seq, name): the root is the lowest score, and the newest entry among equal scores
+        self.heap = []
+        self.offset = 0
+        self.inode = None
+        self.seq = 0
+        self.log_lines = 0
+        self.unterminated = False
+        self.cache = None
+
+# reads log lines appended since the last refresh (by this or any other writer), reloads after a compaction. locked is
+# True while this store holds the lock, nobody can be appending then so a last line without a newline is complete
+    def refresh(self, locked=False):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self.inode is not None:
+                self.reset()
+            return
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.reset()
+            self.inode = stat.st_ino
+        if stat.st_size == self.offset:
+            return
+
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read(stat.st_size - self.offset)
+        end = data.rfind(b'\n') + 1
+        self.offset += end
+        for line in data[:end].decode('utf-8').split('\n'):
+            self.load(line)
+        self.unterminated = end < len(data)
+        # with the lock held the line is a hand-written or legacy log's complete last line, otherwise it is read again
+        if self.unterminated and locked:
+            self.load(data[end:].decode('utf-8'))
+            self.offset += len(data) - end
+
+    def load(self, line):
+        entry = parse_line(line)
+        if entry is None:
+            return
+        name, score = entry
+        item = (score, -self.seq, name)
+        self.seq += 1
+        self.log_lines += 1
+        if len(self.heap) < self.top_n:
+            heapq.heappush(self.heap, item)
+            self.cache = None
+        elif self.heap and item > self.heap[0]:
+            heapq.heapreplace(self.heap, item)
+            self.cache = None
+
+# exclusive lock file shared with the server, waits for other writers (a lock older than stale_lock is broken)
+    def acquire(self):
+        started = time.monotonic()
+        while True:
+            try:
+                return os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                pass
+            self.stats['lock_waits'] += 1
+            try:
+                if time.time() - os.stat(self.lock_path).st_mtime > stale_lock:
+                    os.unlink(self.lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() - started > lock_timeout:
+                raise TimeoutError('Timed out waiting for the leaderboard lock.')
+            time.sleep(0.001)
+
+    def release(self, fd):
+        os.close(fd)
+        os.unlink(self.lock_path)
+
+# appends a new score to the log, returns True if it made the top N
+    def submit(self, name, score):
+        name = ' '.join(str(name).splitlines()).strip()
+        fd = self.acquire()
+        try:
+            self.refresh(locked=True)
+            prefix = '\n' if self.unterminated else ''
+            with open(self.path, 'a', encoding='utf-8', newline='\n') as file:
+                file.write(f'{prefix}{name}, {int(score)}\n')
+            self.stats['submissions'] += 1
+            # nobody else can append while the lock is held, so the last line read is this submission
+            self.refresh(locked=True)
+            mine = -(self.seq - 1)
+            entered = any(item[1] == mine for item in self.heap)
+            if self.log_lines - self.top_n >= self.compact_every:
+                self._compact()
+            return entered
+        finally:
+            self.release(fd)
+
+# rewrites the log with only the top N entries
+    def compact(self):
+        fd = self.acquire()
+        try:
+            self.refresh(locked=True)
+            self._compact()
+        finally:
+            self.release(fd)
+
+    def _compact(self):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8', newline='\n') as file:
+            file.writelines(f'{name}, {score}\n' for name, score in self.top())
+        os.replace(temp_path, self.path)
+        self.stats['compactions'] += 1
+        self.reset()
+        self.refresh(locked=True)
+
+# returns the best n entries as (name, score) pairs, n is at most top_n
+    def top(self, n=None):
+        self.refresh()
+        if self.cache is None:
+            self.cache = [(name, score) for score, _, name in sorted(self.heap, reverse=True)]
+        return self.cache[:self.top_n if n is None else n]
+
+# returns the leaderboard as numbered "rank. name, score" lines
+    def text(self, n=None):
+        return '\n'.join(f'{rank}. {name}, {score}' for rank, (name, score) in enumerate(self.top(n), 1))
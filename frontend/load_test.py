@@ -0,0 +1,337 @@
+# Load generator for the API server.
+#
+# Runs many simulated players on one asyncio event loop. Each player replays the requests the App makes, in the same
+# order:
+#   on startup  GET /get-leaderboard, GET /session and two POST /prefetch-word (the Prefetcher fills its cache)
+#   per round   POST /get-word with a prefetch token, POST /prefetch-word to top the cache up (on its own connection,
+#               like the Prefetcher's thread), GET /hint-N for the hints it uses, one POST /check-word per guess
+#               with think time in between, then POST /finish-round with the username
+# Players solve their word from the local word list (anagram_index.py) after --misses wrong guesses, so they never
+# ask the server for the solution.
+#
+# HTTP/1.1 is spoken directly over asyncio streams (keep-alive, one connection per player like the App's session),
+# so no extra packages are needed. Reports throughput, latency percentiles and error rates per endpoint. It also
+# reports leaderboard contention: how often leaderboard.txt was written and compacted, and the /finish-round latency
+# of rounds that wrote a score against those that did not.
+# Only runs against a server on this machine. By default every player is anonymous and the leaderboard is left alone,
+# a lower --anonymous-rate gives that share of players a username and puts their scores on the server's leaderboard
+# (needed to measure leaderboard contention).
+#
+# Usage:
+#     python load_test.py [--url http://localhost:3000] [--players 50] [--duration 30] [--think 1.0] [--letters 4 5]
+#                         [--misses 2] [--hint-rate 0.1] [--anonymous-rate 1] [--seed 1] [--json results.json]
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from urllib.parse import urlsplit
+
+from anagram_index import AnagramIndex
+from simulate import percentile
+from telemetry import Telemetry
+from word_index import build_buckets, default_words_path
+
+local_hosts = ('localhost', '127.0.0.1', '::1')
+default_leaderboard_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backendAPI', 'leaderboard.txt')
+
+
+class HttpError(Exception):
+    def __init__(self, kind, message):
+        super().__init__(message)
+        # short error kind for the report, like "status_500", "timeout" or "connection"
+        self.kind = kind
+
+
+# one keep-alive HTTP/1.1 connection, reopened after an error
+class Connection:
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, headers=None, body=None):
+        payload = b'' if body is None else json.dumps(body).encode('utf-8')
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}', f'Content-Length: {len(payload)}']
+        if body is not None:
+            lines.append('Content-Type: application/json')
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        message = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload
+        try:
+            return await asyncio.wait_for(self._exchange(message), self.timeout)
+        except asyncio.TimeoutError:
+            self.close()
+            raise HttpError('timeout', f'{path} timed out') from None
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            self.close()
+            raise HttpError('connection', f'{path}: {e}') from e
+
+    async def _exchange(self, message):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(message)
+        await self.writer.drain()
+        status = int((await self.reader.readuntil(b'\r\n')).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                chunks.append(await self.reader.readexactly(size + 2))
+                if size == 0:
+                    break
+            data = b''.join(chunk[:-2] for chunk in chunks)
+        else:
+            data = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, data
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class LoadTest:
+    def __init__(self, url, words, options, rng):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.words = words
+        self.options = options
+        self.rng = rng
+        self.telemetry = Telemetry()
+        self.latencies = {}
+        self.rounds = 0
+        self.solved = 0
+        self.failed_rounds = 0
+        # /finish-round latencies of rounds that put a score on the leaderboard and of rounds that did not
+        self.finish_latencies = {'leaderboard_write': [], 'no_write': []}
+
+    def connection(self):
+        return Connection(self.host, self.port, self.options.timeout)
+
+    async def call(self, connection, method, endpoint, session=None, body=None):
+        headers = {'X-Session-Id': session} if session else None
+        started = time.perf_counter()
+        error = None
+        try:
+            status, data = await connection.request(method, endpoint, headers, body)
+            if status != 200:
+                error = f'status_{status}'
+                raise HttpError(error, f'{endpoint} returned {status}')
+            return data
+        except HttpError as e:
+            error = e.kind
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            self.telemetry.record_request(endpoint, seconds, error=error)
+
+    async def json_call(self, *args, **kwargs):
+        data = await self.call(*args, **kwargs)
+        try:
+            return json.loads(data)
+        except ValueError:
+            raise HttpError('invalid_response', f'{args[2]} returned invalid JSON') from None
+
+    async def prefetch(self, connection, session, letters, cache):
+        try:
+            entry = await self.json_call(connection, 'POST', '/prefetch-word', session, {'letters': letters})
+            # the server's round clock for a prefetched word starts when it is sent
+            entry['fetched_at'] = time.monotonic()
+            cache.append(entry)
+        except HttpError:
+            pass
+
+# one simulated player, plays rounds until the deadline
+    async def player(self, number, letters, deadline):
+        rng = random.Random(self.rng.random())
+        game = self.connection()
+        prefetcher = self.connection()
+        username = '' if rng.random() < self.options.anonymous_rate else f'load{number}'
+        cache = []
+        try:
+            await self.call(game, 'GET', '/get-leaderboard')
+            session = (await self.json_call(game, 'GET', '/session'))['session']
+            for _ in range(2):
+                await self.prefetch(prefetcher, session, letters, cache)
+            while time.monotonic() < deadline:
+                try:
+                    await self.play_round(game, prefetcher, session, letters, username, cache, rng)
+                except HttpError:
+                    self.failed_rounds += 1
+        except HttpError:
+            self.failed_rounds += 1
+        finally:
+            game.close()
+            prefetcher.close()
+
+    async def play_round(self, game, prefetcher, session, letters, username, cache, rng):
+        entry = cache.pop(0) if cache else None
+        body = {'letters': letters} if entry is None else {'letters': letters, 'token': entry['token']}
+        scramble = (await self.json_call(game, 'POST', '/get-word', session, body))['word']
+        refill = asyncio.ensure_future(self.prefetch(prefetcher, session, letters, cache))
+        try:
+            started = time.monotonic() if entry is None else entry['fetched_at']
+
+            hints = [hint for hint in (1, 2, 3) if rng.random() < self.options.hint_rate]
+            for hint in hints:
+                try:
+                    await self.call(game, 'GET', f'/hint-{hint}', session)
+                except HttpError:
+                    # the App shows a placeholder for a hint that failed and the round goes on, the error is still counted
+                    pass
+
+            candidates = sorted(self.words.anagrams(scramble))
+            guesses = 0
+            solved = False
+            while guesses < 8 and not solved:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * self.options.think)
+                if guesses < self.options.misses or not candidates:
+                    letters_list = list(scramble)
+                    rng.shuffle(letters_list)
+                    guess = ''.join(letters_list)
+                else:
+                    guess = candidates.pop(0)
+                guesses += 1
+                result = await self.json_call(game, 'POST', '/check-word', session, {'word': guess})
+                solved = result.get('result') == 'correct'
+
+            elapsed = time.monotonic() - started
+            body = {'guess_attempts': guesses, 'elapsed': elapsed, 'hints': hints, 'username': username}
+            finish_started = time.perf_counter()
+            await self.json_call(game, 'POST', '/finish-round', session, body)
+            kind = 'leaderboard_write' if solved and username else 'no_write'
+            self.finish_latencies[kind].append(time.perf_counter() - finish_started)
+        finally:
+            # the prefetch connection is only free again once the refill is done
+            await refill
+        self.rounds += 1
+        self.solved += solved
+
+    async def run(self, players, duration, letter_counts):
+        deadline = time.monotonic() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(self.player(i, letter_counts[i % len(letter_counts)], deadline) for i in range(players)))
+        return time.perf_counter() - started
+
+
+# samples leaderboard.txt while the test runs: bytes appended, and compactions (the file shrinking back to the top N)
+class LeaderboardWatcher:
+    def __init__(self, path, interval=0.05):
+        self.path = path
+        self.interval = interval
+        self.appended = 0
+        self.compactions = 0
+        self.last_size = self.size()
+
+    def size(self):
+        try:
+            return os.stat(self.path).st_size
+        except OSError:
+            return None
+
+    def sample(self):
+        size = self.size()
+        if size is not None and self.last_size is not None:
+            if size < self.last_size:
+                self.compactions += 1
+            else:
+                self.appended += size - self.last_size
+        self.last_size = size
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.sample()
+
+
+def latency_stats(latencies):
+    latencies = sorted(latencies)
+    return {'count': len(latencies), 'p50_ms': percentile(latencies, 50) * 1000, 'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000, 'max_ms': latencies[-1] * 1000 if latencies else 0.0}
+
+
+async def main(args):
+    with open(args.words, 'r', encoding='utf-8') as file:
+        words = AnagramIndex.from_buckets(build_buckets(file))
+    test = LoadTest(args.url, words, args, random.Random(args.seed))
+    watcher = LeaderboardWatcher(args.leaderboard)
+    watching = asyncio.ensure_future(watcher.watch())
+    seconds = await test.run(args.players, args.duration, args.letters)
+    watching.cancel()
+    watcher.sample()
+
+    snapshot = test.telemetry.snapshot()['endpoints']
+    requests = sum(len(latencies) for latencies in test.latencies.values())
+    errors = sum(sum(stats['errors'].values()) for stats in snapshot.values())
+    writes = len(test.finish_latencies['leaderboard_write'])
+    return {'players': args.players, 'seconds': seconds, 'rounds': test.rounds, 'solved': test.solved,
+            'failed_rounds': test.failed_rounds, 'rounds_per_second': test.rounds / seconds,
+            'requests': requests, 'requests_per_second': requests / seconds, 'errors': errors,
+            'error_rate': errors / requests if requests else 0.0,
+            'overall': latency_stats([seconds for latencies in test.latencies.values() for seconds in latencies]),
+            'endpoints': {endpoint: dict(latency_stats(latencies), errors=snapshot[endpoint]['errors'])
+                          for endpoint, latencies in sorted(test.latencies.items())},
+            'leaderboard': {'writes': writes, 'writes_per_second': writes / seconds,
+                            'bytes_appended': watcher.appended, 'compactions': watcher.compactions,
+                            'finish_round_write': latency_stats(test.finish_latencies['leaderboard_write']),
+                            'finish_round_no_write': latency_stats(test.finish_latencies['no_write'])}}
+
+
+def report(results):
+    print(f"players: {results['players']}, {results['seconds']:.1f} s, rounds: {results['rounds']} "
+          f"({results['rounds_per_second']:.1f} rounds/s), solved: {results['solved']}, failed: {results['failed_rounds']}")
+    overall = results['overall']
+    print(f"requests: {results['requests']} ({results['requests_per_second']:.1f} req/s), errors: {results['errors']} "
+          f"({results['error_rate'] * 100:.2f}%), latency ms: p50 {overall['p50_ms']:.2f}, p95 {overall['p95_ms']:.2f}, "
+          f"p99 {overall['p99_ms']:.2f}, max {overall['max_ms']:.2f}")
+    for endpoint, stats in results['endpoints'].items():
+        errors = ', '.join(f'{kind} {count}' for kind, count in sorted(stats['errors'].items())) or 'no errors'
+        print(f"  {endpoint:<20} {stats['count']:>7} calls, {errors}, latency ms: p50 {stats['p50_ms']:.2f}, "
+              f"p95 {stats['p95_ms']:.2f}, p99 {stats['p99_ms']:.2f}, max {stats['max_ms']:.2f}")
+    board = results['leaderboard']
+    write, no_write = board['finish_round_write'], board['finish_round_no_write']
+    print(f"leaderboard: {board['writes']} writes ({board['writes_per_second']:.1f}/s), {board['bytes_appended']} bytes appended, "
+          f"{board['compactions']} compactions seen")
+    print(f"  /finish-round p95 ms: {write['p95_ms']:.2f} with a leaderboard write, {no_write['p95_ms']:.2f} without")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay the App\'s requests from many concurrent players against a local API server.')
+    parser.add_argument('--url', default='http://localhost:3000', help='API server (must be on this machine)')
+    parser.add_argument('--players', type=int, default=50, help='concurrent players')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run')
+    parser.add_argument('--think', type=float, default=1.0, help='mean seconds between guesses')
+    parser.add_argument('--letters', type=int, nargs='+', default=[4], help='word lengths, spread across the players')
+    parser.add_argument('--misses', type=int, default=2, help='wrong guesses before a player solves the word')
+    parser.add_argument('--hint-rate', type=float, default=0.1, help='chance of using each hint in a round')
+    parser.add_argument('--anonymous-rate', type=float, default=1.0,
+                        help='share of players without a username (no leaderboard writes), lower it to write scores')
+    parser.add_argument('--timeout', type=float, default=10, help='seconds before a request counts as timed out')
+    parser.add_argument('--words', default=default_words_path, help='word list the players solve from')
+    parser.add_argument('--leaderboard', default=default_leaderboard_path, help='leaderboard file to watch for contention')
+    parser.add_argument('--seed', type=int, default=None, help='random seed')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    if urlsplit(args.url).hostname not in local_hosts:
+        parser.error('the load test only runs against a local server')
+
+    results = asyncio.run(main(args))
+    report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
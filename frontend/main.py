@@ -8,23 +8,14 @@
 # using python 3.10 with customtkinter for my graphical interface
 
 # import packages
-from charset_normalizer import md__mypyc
+# the backend modules (api_client pulls in requests, engine loads the word list) are imported by load_backend once
+# the window is up, see App.start_backend
 import customtkinter
-import time
-import json
-import requests
-
-# api target urls
-session_url = 'http://localhost:3000/session'
-test_api_url = 'http://localhost:3000/'
-post_api_url = 'http://localhost:3000/check-word'
-accuracy_url = 'http://localhost:3000/accuracy'
-hint1_url = 'http://localhost:3000/hint-1'
-hint2_url = 'http://localhost:3000/hint-2'
-hint3_url = 'http://localhost:3000/hint-3'
-leaderboard_update_url = 'http://localhost:3000/update-leaderboard'
-leaderboard_get_url = 'http://localhost:3000/get-leaderboard'
-solution_url = 'http://localhost:3000/get-solution'
+import os
+from background import TaskRunner, StallMonitor, RoundTimer
+from game_state import GameState, check, correct, out_of_guesses, wrong_length
+from scoring import compute_score
+from telemetry import Telemetry
 
 
 # game description
@@ -45,6 +36,7 @@ Scoring:
 - If you solve the word in between 5 and 10 seconds, you receive a bonus of 10 points.
 - If you solve the word in between 10 and 15 seconds, you receive a bonus of 5 points.
 - If you take over 15 seconds to solve the word, you do not receive any bonus points.
+- The score shown when you solve the word is a prediction. The server times the round itself, from when it hands out the word until your correct guess arrives, and its score is the one that goes on the leaderboard.
 
 Game Accuracy Rating:
 - Completion %: This shows how many rounds you've successfully completed out of the total rounds played. 
@@ -53,6 +45,7 @@ Game Accuracy Rating:
   It's given as a percentage, where higher percentages indicate more accurate guesses.
 - Game Accuracy %: This is an average of your accuracy in all the rounds you've played so far. 
   It provides an overall measure of how well you're doing in the game.
+  Below it you'll see your average over the last 10 rounds, your best and worst round, and how much your accuracy varies (±).
 
 
 Hints:
@@ -68,6 +61,7 @@ Options:
 - Dark Mode Switch: This switch allows the player to toggle between dark mode and light mode.
 - Username Entry Field: This field allows the player to enter their username or player name.
 - Letter Count Dropdown: The player can choose a letter count from 3 to 6. This setting determines the word length of the word in the game.
+- Difficulty Dropdown: The player can choose Easy, Medium or Hard words, or Any for words of every difficulty.
 - WordCode Checkbox: This checkbox enables or disables the display of the position data for each guess (-)incorrect position, (*)correct position
 - Similarity:This checkbox enables or disables the display of a percentage indicating how similar the player's guessed word is to the correct word.
 - Start: This button initiates the start of the Word Scramble Game.
@@ -87,6 +81,23 @@ Strategy Tips:
 Are you ready to unscramble some words and earn points? Let's start the Word Scramble Game!
 """
 
+# function that creates the game backend, its prefetcher and the server health monitor (None for the in-process engine),
+# runs on the worker thread after the window has been painted
+# SCRAMBLE_BACKEND=local runs the game engine in-process instead, no API server needed
+def load_backend(telemetry):
+    health = None
+    if os.environ.get('SCRAMBLE_BACKEND') == 'local':
+        from engine import GameEngine
+        api = GameEngine()
+    else:
+        from api_client import ApiClient
+        from health import CircuitBreaker, HealthMonitor
+        api = ApiClient(telemetry=telemetry, breaker=CircuitBreaker())
+        health = HealthMonitor(api.breaker, api.ping)
+    from prefetch import Prefetcher
+    return api, Prefetcher(api), health
+
+
 # setting default values for GUI appearance
 customtkinter.set_appearance_mode("light")
 customtkinter.set_default_color_theme("blue")
@@ -99,8 +110,25 @@ class App(customtkinter.CTk):
         self.title("WordScramble.py")
         self.geometry("930x650")
 
-# initializing API and resetting variables (round, complete, round_accuracy_percents)
-        self.connectAPI()
+# fonts are shared between widgets, a round only reconfigures text instead of building new fonts
+        self.fonts = {}
+
+# the worker thread that runs every API call off the Tk thread. The API client (pooled keep-alive connections) or the
+# in-process engine is created on it once the window is up, the Start button is enabled when it is ready
+        self.telemetry = Telemetry()
+        self.api = None
+        self.prefetcher = None
+        self.health = None
+        self.server_state = None
+        # a new session is on its way after the server dropped the old one
+        self.reconnecting = False
+        # the server has given this App a session (the first one can fail when the server is down at startup)
+        self.has_session = False
+        self.tasks = TaskRunner(self)
+        self.game = GameState()
+        self.stall_monitor = StallMonitor(self, telemetry=self.telemetry)
+        self.stall_monitor.start()
+        self.round_timer = RoundTimer(self, self.game.elapsed, lambda seconds: self.turns_label.configure(text=seconds))
 
 
         self.grid_columnconfigure((0,1, 2, 3), weight=1, uniform ='a')
@@ -114,18 +142,18 @@ class App(customtkinter.CTk):
         self.hints_frame.grid(row=1, column=3, rowspan=2, sticky="nsew")
 
 
-        self.title_label = customtkinter.CTkLabel(self, text="Scramble!", font=customtkinter.CTkFont(size=75, weight="bold"))
+        self.title_label = customtkinter.CTkLabel(self, text="Scramble!", font=self.font(75, "bold"))
         self.title_label.grid(row = 0, column= 2, columnspan=2, sticky ="w")
 
-        self.target_label = customtkinter.CTkLabel(self, text="Word ",font=customtkinter.CTkFont(size=75, weight="bold"))
+        self.target_label = customtkinter.CTkLabel(self, text="Word ",font=self.font(75, "bold"))
         self.target_label.grid(row=0, column=1, columnspan=1, sticky="e")
 
-        self.entry = customtkinter.CTkEntry(self, placeholder_text="Guess: ", corner_radius=10, font=customtkinter.CTkFont(size=30))
+        self.entry = customtkinter.CTkEntry(self, placeholder_text="Guess: ", corner_radius=10, font=self.font(30))
         self.entry.grid(row=1,  column=1,sticky="new")
         self.entry.configure(state="disabled")
         self.entry.bind('<Return>', self.word_input)
 
-        self.turns_label = customtkinter.CTkLabel(self, text="#", font=customtkinter.CTkFont(size=50))
+        self.turns_label = customtkinter.CTkLabel(self, text="#", font=self.font(50))
         self.turns_label.grid(row = 1, column = 2)
 
         self.tabView = customtkinter.CTkTabview(self)
@@ -135,13 +163,13 @@ class App(customtkinter.CTk):
         self.tabView.add("Leaderboard")
 
         mode = customtkinter.StringVar(value="light")
-        self.dark_switch = customtkinter.CTkSwitch(self.tabView.tab("Options"), text="Dark Mode", font=customtkinter.CTkFont(size=20), command=self.switch_event, variable=mode, onvalue="dark", offvalue="light")
+        self.dark_switch = customtkinter.CTkSwitch(self.tabView.tab("Options"), text="Dark Mode", font=self.font(20), command=self.switch_event, variable=mode, onvalue="dark", offvalue="light")
         self.dark_switch.pack(padx=20, pady=20)
 
-        self.username_entry = customtkinter.CTkEntry(self.tabView.tab("Options"), placeholder_text="Username", corner_radius=20, font=customtkinter.CTkFont(size=20))
+        self.username_entry = customtkinter.CTkEntry(self.tabView.tab("Options"), placeholder_text="Username", corner_radius=20, font=self.font(20))
         self.username_entry.pack(padx=20, pady=(10))
 
-        self.letter_count_label = customtkinter.CTkLabel(self.tabView.tab("Options"), text="# of Letters", font=customtkinter.CTkFont(size=20))
+        self.letter_count_label = customtkinter.CTkLabel(self.tabView.tab("Options"), text="# of Letters", font=self.font(20))
         self.letter_count_label.pack(padx=20, pady=(10,0))
 
         self.letter_count = customtkinter.CTkOptionMenu(self.tabView.tab("Options"), values=["3", "4", "5", "6"], command=self.change_letter_count)
@@ -149,10 +177,14 @@ class App(customtkinter.CTk):
         letter_count = 3
         self.letter_count.pack()
 
-        self.wordcode_checkbox = customtkinter.CTkCheckBox(self.tabView.tab("Options"), text="WordCode", font=customtkinter.CTkFont(size=15))
+        self.difficulty = None
+        self.difficulty_menu = customtkinter.CTkOptionMenu(self.tabView.tab("Options"), values=["Any", "Easy", "Medium", "Hard"], command=self.change_difficulty)
+        self.difficulty_menu.pack(pady=(10, 0))
+
+        self.wordcode_checkbox = customtkinter.CTkCheckBox(self.tabView.tab("Options"), text="WordCode", font=self.font(15))
         self.wordcode_checkbox.pack(padx=55, pady=(25,5), anchor="w")
 
-        self.similarity_checkbox = customtkinter.CTkCheckBox(self.tabView.tab("Options"), text="Similarity %",font=customtkinter.CTkFont(size=15))
+        self.similarity_checkbox = customtkinter.CTkCheckBox(self.tabView.tab("Options"), text="Similarity %",font=self.font(15))
         self.similarity_checkbox.pack(padx=55, anchor="w")
 
         self.rules_text = customtkinter.CTkTextbox(self.tabView.tab("Rules"), height=550, width=400, wrap="word")
@@ -160,13 +192,16 @@ class App(customtkinter.CTk):
         self.rules_text.configure(state="disabled")
         self.rules_text.pack()
 
-        self.leaderboard_label = customtkinter.CTkLabel(self.tabView.tab("Leaderboard"),font=customtkinter.CTkFont(size=20, weight="bold"))
+        self.leaderboard_label = customtkinter.CTkLabel(self.tabView.tab("Leaderboard"),font=self.font(20, "bold"))
         self.leaderboard_label.pack(pady=60)
-        self.print_leaderboard()
+        self.leaderboard_text = None
 
-        self.start_button = customtkinter.CTkButton(self.tabView.tab("Options"), text = "Start Game", command=self.start_button, font=customtkinter.CTkFont(size=25, weight="bold"), corner_radius=20, height=60)
+        self.start_button = customtkinter.CTkButton(self.tabView.tab("Options"), text = "Start Game", command=self.start_button, font=self.font(25, "bold"), corner_radius=20, height=60, state="disabled")
         self.start_button.pack(padx=20, pady=20)
 
+        self.server_label = customtkinter.CTkLabel(self.tabView.tab("Options"), text="Server: connecting", font=self.font(15))
+        self.server_label.pack()
+
         self.hint1 = customtkinter.CTkButton(self.hints_frame, text="Hint 1", command=self.hint1, state="disabled")
         self.hint1.pack(padx=20, pady=(25, 5))
 
@@ -179,171 +214,178 @@ class App(customtkinter.CTk):
         self.game_frame.grid_columnconfigure((0), weight=1, uniform = 'b')
         self.game_frame.grid_rowconfigure((0), weight=0, uniform = 'd')
 
+# preallocated game board: a warning row and one row per guess, rounds only change their text
+        self.warning_label = customtkinter.CTkLabel(self.game_frame, text="", text_color="red", font=self.font(20, "bold"))
+        self.warning_label.grid(row=0, column=0)
+        self.guess_rows = []
+        for i in range(1, 10):
+            guess_label = customtkinter.CTkLabel(self.game_frame, text="", font=self.font(30))
+            guess_label.grid(row=i, column=0, sticky="nsew")
+            self.guess_rows.append(guess_label)
+
         self.points_view = customtkinter.CTkTabview(self)
         self.points_view.grid(column=3, row=3, sticky="nsew")
         self.points_view.add("Score")
         self.points_view.add("Recent")
-        self.points_label = customtkinter.CTkLabel(self.points_view.tab("Score"), text="Score:", font=customtkinter.CTkFont(size=40, weight="bold"))
+        self.points_label = customtkinter.CTkLabel(self.points_view.tab("Score"), text="Score:", font=self.font(40, "bold"))
         self.points_label.pack(padx=20, pady=(10, 0))
 
-        self.completion_percent_label = customtkinter.CTkLabel(self.points_view.tab("Recent"), text="Completion: ", font=customtkinter.CTkFont(size=20))
+        self.completion_percent_label = customtkinter.CTkLabel(self.points_view.tab("Recent"), text="Completion: ", font=self.font(20))
         self.completion_percent_label.grid(row=0, column=0)
-        self.game_accuracy_percent_label = customtkinter.CTkLabel(self.points_view.tab("Recent"),text="Game Accuracy: ", font=customtkinter.CTkFont(size=20))
+        self.game_accuracy_percent_label = customtkinter.CTkLabel(self.points_view.tab("Recent"),text="Game Accuracy: ", font=self.font(20))
         self.game_accuracy_percent_label.grid(row=2, column=0)
-        self.round_accuracy_percent_label = customtkinter.CTkLabel(self.points_view.tab("Recent"), text="Round Accuracy: ", font=customtkinter.CTkFont(size=20))
+        self.round_accuracy_percent_label = customtkinter.CTkLabel(self.points_view.tab("Recent"), text="Round Accuracy: ", font=self.font(20))
         self.round_accuracy_percent_label.grid(row=1, column=0)
+        self.accuracy_stats_label = customtkinter.CTkLabel(self.points_view.tab("Recent"), text="", font=self.font(15), justify="left")
+        self.accuracy_stats_label.grid(row=3, column=0)
 
-        self.hint1Label = customtkinter.CTkLabel(self.hints_frame, font=customtkinter.CTkFont(size=15))
-        self.hint2Label = customtkinter.CTkLabel(self.hints_frame, font=customtkinter.CTkFont(size=15))
-        self.hint3Label = customtkinter.CTkLabel(self.hints_frame, font=customtkinter.CTkFont(size=15))
-
-# application function. Setting initial values for buttons & entry boxes
-    def run_game(self):
-        global running
-        global start_time
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-        self.turns_label.configure(text = int(elapsed_time))
-        if running == True:
-            self.after(1000, self.run_game)
-            self.entry.configure(state="normal")
-            self.start_button.configure(state="disabled")
-            self.hint1.configure(state="normal")
-            self.hint2.configure(state="normal")
-            self.hint3.configure(state="normal")
-        else:
-            self.entry.configure(state="disabled")
-            self.start_button.configure(state="normal")
-            self.hint1.configure(state="disabled")
-            self.hint2.configure(state="disabled")
-            self.hint3.configure(state="disabled")
+        self.hint1Label = customtkinter.CTkLabel(self.hints_frame, font=self.font(15))
+        self.hint2Label = customtkinter.CTkLabel(self.hints_frame, font=self.font(15))
+        self.hint3Label = customtkinter.CTkLabel(self.hints_frame, font=self.font(15))
 
+# hidden Stats tab (toggled with F12), SCRAMBLE_STATS_FILE also dumps the stats to a file every 10 seconds
+        self.stats_text = None
+        self.bind("<F12>", self.toggle_stats)
+        self.stats_file = os.environ.get('SCRAMBLE_STATS_FILE')
+        if self.stats_file:
+            self.after(10000, self.dump_stats)
 
-# function to retrieve scrambled word from API
-    def get_word(self):
-        api_url = 'http://localhost:3000/get-word'
-        global letter_count
-        letter = letter_count
-        data = {'letters': letter}
-        try:
-            response = requests.post(api_url, data=data)
-            if response.status_code == 200:
-                word = response.json()['word']
-            else:
-                print(f'Error: Received status code {response.status_code} from the API.')
+# nothing touches the network before the first frame: the backend is loaded once the pending redraws have run
+        self.after_idle(self.start_backend)
 
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Failed to connect to the API: {e}')
-        return word
+# returns a shared CTkFont, each size/weight is only created once
+    def font(self, size, weight="normal"):
+        key = (size, weight)
+        if key not in self.fonts:
+            self.fonts[key] = customtkinter.CTkFont(size=size, weight=weight)
+        return self.fonts[key]
 
 
-# function to check solution through API. Returns correctness boolean, position_data, and similarity %
-    def check_word(self, input_word):
-        global position_data
-        global similarity
-
-        data = {'word': input_word}
-
-        try:
-            response = requests.post(post_api_url, data=data)
-
-            if response.status_code == 200:
-                result = response.json()['result']
-                position_data = response.json()['score']['code']
-                similarity = response.json()['score']['similarity']
-                if result == "correct":
-                    return True
-                else:
-                    return False
-            else:
-                print(f'Error: Received status code {response.status_code} from the API.')
+# enables the entry and hint buttons while a round runs, only called when the round starts or ends
+    def set_round_controls(self, active):
+        in_round = "normal" if active else "disabled"
+        self.entry.configure(state=in_round)
+        self.start_button.configure(state="disabled" if active else "normal")
+        self.hint1.configure(state=in_round)
+        self.hint2.configure(state=in_round)
+        self.hint3.configure(state=in_round)
+
+
+# ends the round: stops the round clock and locks the controls, returns the precise round time in seconds. GameState
+# keeps the only round clock, the same elapsed time is shown, scored and sent to the backend
+    def end_round(self):
+        self.set_round_controls(False)
+        elapsed = self.game.end_round()
+        self.round_timer.stop()
+        return elapsed
+
 
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Failed to connect to the API: {e}')
+# function to retrieve scrambled word from API (runs on the worker thread), a prefetch token starts the prefetched word
+    def get_word(self, letters, token=None):
+        return self.api.get_word(letters, token, self.difficulty)
+
+
+# function to check solution through API (runs on the worker thread). Returns the check result with position_data and similarity %
+    def check_word(self, input_word):
+        return self.api.check_word(input_word)
 
 
 # function that starts the game after use presses the start button
     def start_button(self):
         if self.username_entry.get() == "":
-            self.warning_label = customtkinter.CTkLabel(self.game_frame, text="Enter Username", text_color="red", font=customtkinter.CTkFont(size=20, weight="bold"))
-            self.warning_label.grid(row=0, column=0)
+            self.warning_label.configure(text="Enter Username")
         else:
-            if self.check_api_connection():
-                self.target_label.configure(text_color="DodgerBlue4", font=customtkinter.CTkFont(size=75, weight="bold"))
-                for i in range(10):
-                    self.guess_label = customtkinter.CTkLabel(self.game_frame, text=(""))
-                    self.guess_label.grid(row=i, column=0, sticky="nsew")
-                global guess_number
-                guess_number = 0
-                global running
-                running = True
-                global start_time
-                start_time = time.time()
-                global start_word
-                start_word = self.get_word()
-                self.title_label.configure(text="")
-                self.target_label.configure(text=start_word + " ")
-                self.target_label.grid(columnspan=3, sticky="nsew")
-                global count
-                count = 1
-                global h1, h2, h3
-                h1 = False
-                h2 = False
-                h3 = False
-                self.run_game()
+            global letter_count
+            self.start_button.configure(state="disabled")
+            prefetched = self.prefetcher.take(letter_count, self.difficulty)
+            if prefetched is None:
+                self.tasks.submit(self.get_word, letter_count, on_done=self.begin_round, on_error=self.api_error)
+            else:
+                # the board appears straight away, the server starts the prefetched word in the background. Both
+                # round clocks run from the moment the prefetched word arrived
+                self.begin_round(prefetched['word'], prefetched['fetched_at'])
+                self.tasks.submit(self.get_word, letter_count, prefetched['token'], on_done=self.confirm_word, on_error=self.prefetched_word_failed)
+
+
+# the server picks a new word if the prefetched one expired, the board is switched over to it
+    def confirm_word(self, word):
+        if word != self.game.word:
+            self.game.replace_word(word)
+            self.target_label.configure(text=word + " ")
+
+
+# the server could not start the prefetched word the board already shows, guesses would be checked against another
+# word, so the round is called off and the board cleared
+    def prefetched_word_failed(self, error):
+        if self.game.running:
+            self.end_round()
+        self.target_label.configure(text="")
+        for guess_label in self.guess_rows:
+            guess_label.configure(text="")
+        self.api_error(error)
+
+
+# function that sets up the board once the scrambled word has arrived from the API
+    def begin_round(self, word, started=None):
+        self.target_label.configure(text_color="DodgerBlue4", font=self.font(75, "bold"))
+        self.warning_label.configure(text="")
+        for guess_label in self.guess_rows:
+            guess_label.configure(text="")
+        self.game.begin_round(word, started)
+        self.title_label.configure(text="")
+        self.target_label.configure(text=word + " ")
+        self.target_label.grid(columnspan=3, sticky="nsew")
+        self.stall_monitor.reset()
+        if self.prefetcher is not None:
+            self.prefetcher.fill()
+        self.set_round_controls(True)
+        self.round_timer.start()
+
+
+# shown when an API call fails before the round could start
+    def api_error(self, error):
+        print(f'Error: {error}')
+        if self.session_lost(error):
+            return
+        # watch_health enables the button again once the server is back
+        self.start_button.configure(state="disabled" if self.server_state == "open" else "normal")
+        self.warning_label.configure(text="API Server Not Running")
 
 
 # function to return hint 1 data from API
     def hint1(self):
-        global h1
-        speech_type=''
-        try:
-            response = requests.get(hint1_url)
-            if response.status_code == 200:
-                speech_type = response.json()['partOfSpeech']
-            else:
-                print(f'Error: Received status code {response.status_code} from the API.')
-                speech_type = "Unknown"
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Failed to connect to the API: {e}')
+        self.game.use_hint(1)
+        self.tasks.submit(self.api.hint1, on_done=self.show_hint1, on_error=lambda e: self.show_hint1("Unknown", e))
+
+    def show_hint1(self, speech_type, error=None):
+        if error is not None:
+            print(f'Error: {error}')
         self.hint1Label.configure(text="Speech: "+speech_type)
         self.hint1Label.pack(pady=2)
-        h1 = True
 
 
 # function to return hint 2 data from API
     def hint2(self):
-        global h2
-        try:
-            response = requests.get(hint2_url)
-            if response.status_code == 200:
-                first_letter = response.text
-            else:
-                print(f'Error: Received status code {response.status_code} from the API.')
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Failed to connect to the API: {e}')
+        self.game.use_hint(2)
+        self.tasks.submit(self.api.hint2, on_done=self.show_hint2, on_error=lambda e: self.show_hint2("", e))
+
+    def show_hint2(self, first_letter, error=None):
+        if error is not None:
+            print(f'Error: {error}')
         self.hint2Label.configure(text="The first letter is " + first_letter)
         self.hint2Label.pack()
-        h2 = True
 
 
 # function to return hint 3 data from API
     def hint3(self):
-        global h3
-        definition = ""
-        try:
-            response = requests.get(hint3_url)
-            if response.status_code == 200:
-                result = response.json()['definition']
-                definition = result
-            else:
-                print(f'Error: Received status code {response.status_code} from the API.')
-                definition = "No definition available "
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Failed to connect to the API: {e}')
+        self.game.use_hint(3)
+        self.tasks.submit(self.api.hint3, on_done=self.show_hint3, on_error=lambda e: self.show_hint3("No definition available ", e))
+
+    def show_hint3(self, definition, error=None):
+        if error is not None:
+            print(f'Error: {error}')
         self.hint3Label.configure(text=definition, wraplength= 175)
         self.hint3Label.pack()
-        h3 = True
 
 
 # enables dark mode switch functionality
@@ -355,208 +397,257 @@ class App(customtkinter.CTk):
     def change_letter_count(self, selection):
         global letter_count
         letter_count = selection
+        if self.prefetcher is not None:
+            self.prefetcher.set_letters(letter_count)
+            self.prefetcher.fill()
+
+
+# enables difficulty selection, Any picks words of every difficulty
+    def change_difficulty(self, selection):
+        self.difficulty = None if selection == "Any" else selection.lower()
+        if self.prefetcher is not None:
+            self.prefetcher.set_difficulty(self.difficulty)
+            self.prefetcher.fill()
 
 # function that runs everytime user presses enter, it will process user guess
     def word_input(self, event = None):
-        global guess_number
-        global letter_num
-        global running
-        global start_word
-        global count
-        global complete
         word = self.entry.get()
-        if len(word) == len(start_word):
-            letter_num= True
-            if running:
-                guess_number = guess_number + 1
-                self.entry.delete(0, 'end')
-                if (self.check_word(word)):
-                    complete = True
-                    running = False
-                    self.postGame()
-                    return
-                self.write_word(word)
-                if count >= 8:
-                    complete = False
-                    running = False
-                    self.postGame()
-                count += 1
-        else:
-            letter_num = False
+        outcome = self.game.submit_guess(word)
+        if outcome == check:
+            self.entry.delete(0, 'end')
+            self.tasks.submit(self.check_word, word, on_done=lambda response: self.guess_checked(word, response), on_error=self.guess_failed)
+        elif outcome == wrong_length:
             self.write_word("Wrong number of letters")
 
+
+# function that processes the API check result for a guess, sets position_data and similarity %
+    def guess_checked(self, word, response):
+        outcome = self.game.guess_checked(response)
+        if outcome == correct:
+            self.postGame()
+            return
+        self.write_word(word, self.game.last_row)
+        if outcome == out_of_guesses:
+            self.postGame()
+
+
+# a guess that could not be checked does not use up one of the 8 guesses
+    def guess_failed(self, error):
+        print(f'Error: {error}')
+        self.game.guess_failed()
+        self.session_lost(error)
+
+
 # function to write string parameter to game screen, also includes position_data and similarity % if boxes are checked
-    def write_word(self, text):
-        global letter_num
-        global count
-        global similarity
-        global position_data
+    def write_word(self, text, row=None):
+        if row is None:
+            row = self.game.count
         information= ""
-        if self.similarity_checkbox.get() == 1 & letter_num == True:
-            information = information + "[" +similarity + "] "
-        if self.wordcode_checkbox.get() == 1 & letter_num == True:
-            information = information + position_data + " "
-        self.guess_label = customtkinter.CTkLabel(self.game_frame, text=(text + " " + information), font=customtkinter.CTkFont(size=30))
-        self.guess_label.grid(row=count, column=0, sticky="nsew")
+        if self.similarity_checkbox.get() == 1 and self.game.valid_length:
+            information = information + "[" + self.game.similarity + "] "
+        if self.wordcode_checkbox.get() == 1 and self.game.valid_length:
+            information = information + self.game.position_data + " "
+        self.guess_rows[row - 1].configure(text=(text + " " + information))
 
 
 # funtion that runs after round completion, displays score and recent round data
     def postGame(self):
-        global complete
-        global scramble
-        global guess_number
-
-        scramble = self.target_label.cget("text")
-
         self.hint1Label.configure(text="")
         self.hint2Label.configure(text="")
         self.hint3Label.configure(text="")
 
-        if complete:
-            self.accuracy(guess_number)
-            self.write_word(self.get_solution())
-            self.target_label.configure(text_color="green")
-            self.target_label.configure(text=scramble + " -> " + self.get_solution())
-            self.points_label.configure(text="Score: \n" + self.score())
-            self.update_leaderboard()
-            self.print_leaderboard()
-
-        else:
-            self.accuracy(guess_number)
-            self.target_label.configure(text_color="red", font=customtkinter.CTkFont(size=40, weight="bold"), text="No More Guesses\n" + scramble + " -> " + self.get_solution())
-
-
-# calculates score
-    def score(self):
-        global h1, h2, h3, start_word
+        print(f'Max UI stall this round: {self.stall_monitor.reset() * 1000:.1f} ms')
 
-        hint_score = 0
-        time_score = 0
-        word_score = 0
+        elapsed = self.end_round()
+        # predicted score, replaced by the backend's score when the round results arrive
+        if self.game.complete:
+            self.points_label.configure(text="Score: \n" + str(compute_score(len(self.game.word), elapsed, self.game.hints_used())))
+        self.tasks.submit(self.api.finish_round, self.game.guess_number, elapsed, self.game.hints_used(), str(self.username_entry.get()),
+                          on_done=self.show_round_results, on_error=self.round_results_failed)
 
-        word_length = len(start_word)
-        word_score = word_length*3
 
-        time = self.turns_label.cget("text")
-        if time < 5:
-            time_score = 15
-        elif 5<time<10:
-            time_score = 10
-        elif 10<time<15:
-            time_score = 5
-        elif time > 15:
-            time_score = 0
+    def round_results_failed(self, error):
+        print(f'Error: {error}')
+        self.session_lost(error)
 
-        if h1:
-            hint_score = hint_score - 1
-        if h2:
-            hint_score = hint_score - 2
-        if h3:
-            hint_score = hint_score - 4
-
-        score = word_score + time_score + hint_score
-        return str(score)
 
+# displays the end of round results (solution, accuracy, score and leaderboard) returned by the API
+    def show_round_results(self, results):
+        scramble = self.game.word
+        solution = results['solution']
+        self.accuracy(results)
+        if self.game.complete:
+            self.write_word(solution)
+            self.target_label.configure(text_color="green")
+            self.target_label.configure(text=scramble + " -> " + solution)
+            self.points_label.configure(text="Score: \n" + str(results['score']))
+            self.print_leaderboard(results['leaderboard'])
+        else:
+            self.target_label.configure(text_color="red", font=self.font(40, "bold"), text="No More Guesses\n" + scramble + " -> " + solution)
+
+
+# function that displays the accuracy % data returned by the API
+    def accuracy(self, response):
+        completion_percent = response['completion']
+        round_accuracy = response['round_accuracy']
+        game_accuracy = response['game_accuracy']
+
+        self.completion_percent_label.configure(text="Completion: {}%".format(round(completion_percent)))
+        self.round_accuracy_percent_label.configure(text="Round Accuracy: {}% ".format(round(round_accuracy)))
+        self.game_accuracy_percent_label.configure(text="Game Accuracy: {}%".format(round(game_accuracy)))
+
+        stats = response.get('accuracy_stats')
+        if stats:
+            self.accuracy_stats_label.configure(text="Last {} rounds: {}%\nBest {}%  Worst {}%  ± {}%\n{} rounds played".format(
+                stats['window'], round(stats['recent_mean']), round(stats['max']), round(stats['min']), round(stats['stddev']), stats['count']))
+
+
+# shows or hides the Stats tab with the client telemetry (request latency, errors, bytes and UI stalls)
+    def toggle_stats(self, event=None):
+        if self.stats_text is not None:
+            self.tabView.delete("Stats")
+            self.stats_text = None
+            return
+        self.tabView.add("Stats")
+        self.stats_text = customtkinter.CTkTextbox(self.tabView.tab("Stats"), height=480, width=400, wrap="none", font=self.font(13))
+        self.stats_text.pack()
+        dump_button = customtkinter.CTkButton(self.tabView.tab("Stats"), text="Dump", command=lambda: self.write_stats("stats.json", "stats.prom"))
+        dump_button.pack(pady=10)
+        self.tabView.set("Stats")
+        self.show_stats()
+
+# refreshes the Stats tab once a second while it is open
+    def show_stats(self):
+        if self.stats_text is None:
+            return
+        self.stats_text.configure(state="normal")
+        self.stats_text.delete("0.0", "end")
+        self.stats_text.insert("0.0", self.telemetry.summary())
+        self.stats_text.configure(state="disabled")
+        self.after(1000, self.show_stats)
+
+    def write_stats(self, *paths):
+        for path in paths:
+            try:
+                self.telemetry.dump(path)
+            except OSError as e:
+                print(f'Error: {e}')
+
+    def dump_stats(self):
+        self.write_stats(self.stats_file)
+        self.after(10000, self.dump_stats)
+
+
+# function to get leaderboard information from API in the background
+    def load_leaderboard(self):
+        self.tasks.submit(self.api.get_leaderboard, on_done=self.print_leaderboard)
+
+
+# function to print leaderboard information to GUI, the label is only rebuilt when the leaderboard changed
+    def print_leaderboard(self, leaderboard):
+        if leaderboard == self.leaderboard_text:
+            return
+        self.leaderboard_text = leaderboard
+        leaderboard_txt = ""
+        leaderboard_list = leaderboard.split('\n')
+        for entry in leaderboard_list:
+            leaderboard_txt = leaderboard_txt + entry + ('\n')
+        self.leaderboard_label.configure(text=leaderboard_txt)
 
-# function that contacts API to return accuracy % data
-    def accuracy(self, guess_attempts):
-        data = {'guess_attempts': guess_attempts}
 
-        try:
-            response = requests.post(accuracy_url, data=data)
-            if response.status_code == 200:
-                completion_percent = response.json()['completion']
-                round_accuracy = response.json()['round_accuracy']
-                game_accuracy = response.json()['game_accuracy']
+# loads the backend modules and creates the API client (or engine) on the worker thread
+    def start_backend(self):
+        self.tasks.submit(load_backend, self.telemetry, on_done=self.backend_ready, on_error=self.backend_error)
 
-                self.completion_percent_label.configure(text="Completion: {}%".format(round(completion_percent)))
-                self.round_accuracy_percent_label.configure(text="Round Accuracy: {}% ".format(round(round_accuracy)))
-                self.game_accuracy_percent_label.configure(text="Game Accuracy: {}%".format(round(game_accuracy)))
 
-            else:
-                print(f'Error: Received status code {response.status_code} from the API.')
+    def backend_error(self, error):
+        print(f'Error: {error}')
+        self.warning_label.configure(text="Could not load the game")
 
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Failed to connect to the API: {e}')
 
-
-# function to convert leaderboard (name/score) data into malleable array
-    def read_high_scores(self, filename):
-        try:
-            with open(filename, 'r') as file:
-                high_scores = [line.strip().split(", ") for line in file.readlines()]
-                return high_scores
-        except FileNotFoundError:
-            return []
+# the backend is ready: the session and the leaderboard load in the background and the game can start
+    def backend_ready(self, backend):
+        self.api, self.prefetcher, self.health = backend
+        self.prefetcher.set_letters(letter_count)
+        self.prefetcher.set_difficulty(self.difficulty)
+        self.connectAPI()
+        self.load_leaderboard()
+        self.start_button.configure(state="normal")
+        if self.health is None:
+            self.server_label.configure(text="Server: in-process")
+        else:
+            self.health.start()
+            self.watch_health()
+
+
+# shows the circuit breaker state (health.py). While the server is down the game can't be started and calls fail
+# straight away, when it is back the session and the leaderboard are loaded again
+    def watch_health(self):
+        state = self.api.breaker.state
+        if state == "open":
+            retry_in = self.health.retry_in()
+            self.server_label.configure(text_color="red", text="Server: offline" + (", retrying in {} s".format(round(retry_in)) if retry_in is not None else ""))
+            if self.server_state != "open":
+                self.start_button.configure(state="disabled")
+                self.warning_label.configure(text="API Server Not Running")
+        elif state == "half_open":
+            self.server_label.configure(text_color="orange", text="Server: checking")
+        elif state == "connecting":
+            self.server_label.configure(text_color="orange", text="Server: connecting")
+        elif self.server_state != "closed":
+            self.server_label.configure(text_color="green", text="Server: online")
+            if self.server_state == "open":
+                self.server_recovered()
+        self.server_state = state if state != "half_open" else self.server_state
+        self.after(250, self.watch_health)
+
+
+# the session survives a blip, an expired one is replaced by session_lost. Only a session that was never created is
+# asked for here, the prefetched words of the failed attempts go with it
+    def server_recovered(self):
+        self.warning_label.configure(text="")
+        if not self.game.running:
+            self.start_button.configure(state="normal")
+        if not self.has_session and not self.reconnecting:
+            self.prefetcher.clear()
+            self.connectAPI()
+        self.load_leaderboard()
 
 
-# function to return the solution for each round <<-- (DISPLAY PURPOSES NOT UTILIZED FOR GAME LOGIC)
-    def get_solution(self):
-        try:
-            response = requests.get(solution_url)
-            if response.status_code == 200:
-                return(response.text)
-            else:
-                print(f'Error: Received status code {response.status_code} from the API.')
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Failed to connect to the API: {e}')
+# the server dropped the session (it expired or the server restarted), every call would fail until there is a new one.
+# The round in play is lost and the old session's prefetched words are dropped. Returns False for any other error
+    def session_lost(self, error):
+        from api_client import SessionExpired
+        if not isinstance(error, SessionExpired):
+            return False
+        if self.game.running:
+            self.end_round()
+        self.start_button.configure(state="normal")
+        self.warning_label.configure(text="Session expired, press Start")
+        self.has_session = False
+        if not self.reconnecting:
+            self.reconnecting = True
+            self.prefetcher.clear()
+            self.connectAPI()
+        return True
 
 
-# function to get leaderboard information from API and print to GUI
-    def print_leaderboard(self):
-        leaderboard_txt = ""
-        try:
-            response = requests.get(leaderboard_get_url)
-            if response.status_code == 200:
-                response = response.text
-                data = json.loads(response)
-                leaderboard_list = data["leaderboard"].split('\n')
-                for entry in leaderboard_list:
-                    leaderboard_txt = leaderboard_txt + entry + ('\n')
-            else:
-                print(f'Error: Received status code {response.status_code} from the API.')
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Failed to connect to the API: {e}')
-        self.leaderboard_label.configure(text=leaderboard_txt)
+# another API connection verification, used to initialize variables on the backend server
+    def connectAPI(self):
+        self.tasks.submit(self.api.start_session, on_done=self.session_started, on_error=self.session_failed)
 
 
-# function to update the API leaderboard with current round score and username date
-    def update_leaderboard(self):
-        data = {"username": str(self.username_entry.get()),
-                "newScore": int(self.score())
-                }
-        try:
-            response = requests.post(leaderboard_update_url, json=data)  # Use json=data to send data as JSON
-            if response.status_code == 200:
-                print("Leaderboard Updated")
-            else:
-                print(f'Error: Received status code {response.status_code} from the API.')
-                print(f'Response content: {response.text}')
-
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Failed to connect to the API: {e}')
-
-
-# verifies API connection
-    def check_api_connection(self):
-        try:
-            response = requests.get(test_api_url)
-            return response.status_code == 200
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Failed to connect to the API: {e}')
-            self.warning_label = customtkinter.CTkLabel(self.game_frame, text="API Server Not Running", text_color="red",font=customtkinter.CTkFont(size=20, weight="bold"))
-            self.warning_label.grid(row=0, column=0)
-            return False
+# prefetching starts once the session exists, prefetched words belong to the session
+    def session_started(self, session):
+        print("Operational")
+        self.reconnecting = False
+        self.has_session = True
+        self.prefetcher.fill()
 
 
-# another API connection verification, used to initialize variables on the backend server
-    def connectAPI(self):
-        try:
-            response = requests.get(session_url)
-            if response.status_code == 200:
-                print("Operational")
-        except requests.exceptions.RequestException as e:
-            print(f'Error: Failed to connect to the API: {e}')
+    def session_failed(self, error):
+        self.reconnecting = False
+        self.api_error(error)
 
 
 # refresh for dual-running scripts
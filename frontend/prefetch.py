@@ -0,0 +1,86 @@
+# Prefetches the next round while the current one is played.
+#
+# A small bounded cache holds scrambled words (with their prefetch token) for the selected letter count and difficulty,
+# so pressing Start is served locally. Changing either drops the cache. The server's round clock starts when it sends a
+# prefetched word, each entry keeps the monotonic time it arrived so the App's clock starts there too.
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from api_client import ApiError
+
+
+class Prefetcher:
+    def __init__(self, client, size=2):
+        self.client = client
+        self.size = size
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+        self.lock = threading.Lock()
+        self.letters = None
+        self.difficulty = None
+        self.cache = deque()
+        self.pending = 0
+        # bumped on every letter count or difficulty change so words fetched for the old settings are thrown away
+        self.generation = 0
+
+# switches the cache to a new letter count, stale entries are invalidated
+    def set_letters(self, letters):
+        letters = int(letters)
+        with self.lock:
+            if letters == self.letters:
+                return
+            self.letters = letters
+            self.cache.clear()
+            self.generation += 1
+
+# switches the cache to a new difficulty (None picks words uniformly)
+    def set_difficulty(self, difficulty):
+        with self.lock:
+            if difficulty == self.difficulty:
+                return
+            self.difficulty = difficulty
+            self.cache.clear()
+            self.generation += 1
+
+# drops every cached word, prefetch tokens belong to the session and are useless once it has expired
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+            self.generation += 1
+
+# tops the cache up to size entries in the background
+    def fill(self):
+        with self.lock:
+            if self.letters is None:
+                return
+            missing = self.size - len(self.cache) - self.pending
+            for _ in range(missing):
+                self.pending += 1
+                self.executor.submit(self._fetch, self.letters, self.difficulty, self.generation)
+
+    def _fetch(self, letters, difficulty, generation):
+        try:
+            entry = self.client.prefetch_word(letters, difficulty)
+            entry['fetched_at'] = time.monotonic()
+        except ApiError as e:
+            print(f'Error: {e}')
+            entry = None
+        with self.lock:
+            self.pending -= 1
+            stale = generation != self.generation
+            if entry is not None and not stale:
+                self.cache.append(entry)
+        if stale:
+            self.fill()
+
+# returns a cached {token, word, fetched_at} for the letter count and difficulty, or None on a cache miss
+    def take(self, letters, difficulty=None):
+        with self.lock:
+            if int(letters) != self.letters or difficulty != self.difficulty or not self.cache:
+                return None
+            return self.cache.popleft()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
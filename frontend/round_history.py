@@ -0,0 +1,204 @@
+# Durable round history, the Python twin of backendAPI/roundHistory.js, and a streaming reader for analytics.
+#
+# Every finished round is appended to rounds.jsonl as one JSON line:
+#     {"at": 1718000000000, "user": "name", "word": "stop", "solved": true, "guesses": 3, "elapsed": 4.2, "hints": [1], "score": 20}
+# RoundHistory keeps running totals over the whole log, updated in O(1) per round. It shares the log and the
+# rounds.jsonl.summary.json snapshot with the server, using the same format and the same read-the-new-tail protocol.
+# read_rounds streams rounds from any number of log files one line at a time. RoundAnalytics folds them into
+# per-user and per-word totals, so its memory grows with the number of users and words, never with the rounds.
+
+import json
+import os
+import time
+
+default_rounds_path = os.environ.get(
+    'ROUNDS_LOG', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backendAPI', 'rounds.jsonl'))
+
+
+# function to return empty running totals (the same structure the server saves)
+def empty_totals():
+    return {'rounds': 0, 'solved': 0, 'guesses': 0, 'elapsed': 0, 'score': 0, 'hints': {'1': 0, '2': 0, '3': 0}}
+
+
+# function to parse one log line, returns None for blank or malformed lines
+def parse_round(line):
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+# function to yield every round in the given log files, one line at a time
+def read_rounds(paths):
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                record = parse_round(line)
+                if record is not None:
+                    yield record
+
+
+# function to read a number field, 0 for missing or malformed values
+def number(record, key):
+    value = record.get(key)
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0
+
+
+class RoundHistory:
+    def __init__(self, path=default_rounds_path, snapshot_every=1000):
+        self.path = path
+        self.summary_path = path + '.summary.json'
+        self.snapshot_every = snapshot_every
+        self.totals = empty_totals()
+        self.offset = 0
+        self.inode = None
+        self.since_snapshot = 0
+        self.load_snapshot()
+        self.refresh()
+
+# starts from the saved totals if they still match the log (same file, not shorter than the saved offset)
+    def load_snapshot(self):
+        try:
+            with open(self.summary_path, 'r', encoding='utf-8') as file:
+                snapshot = json.load(file)
+            stat = os.stat(self.path)
+        except (OSError, ValueError):
+            return
+        if snapshot.get('inode') == stat.st_ino and snapshot.get('offset', stat.st_size + 1) <= stat.st_size and snapshot.get('totals'):
+            self.totals = snapshot['totals']
+            self.offset = snapshot['offset']
+            self.inode = stat.st_ino
+
+    def save_snapshot(self):
+        temp_path = f'{self.summary_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'inode': self.inode, 'offset': self.offset, 'totals': self.totals}, file)
+        os.replace(temp_path, self.summary_path)
+        self.since_snapshot = 0
+
+# folds in the complete lines appended since the last read (by this or any other writer)
+    def refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.totals = empty_totals()
+            self.offset = 0
+            self.inode = stat.st_ino
+        if stat.st_size == self.offset:
+            return
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read(stat.st_size - self.offset)
+        # a line another writer is still appending is left for the next read
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode('utf-8').split('\n'):
+            record = parse_round(line)
+            if record is not None:
+                self.fold(record)
+        self.offset += end
+
+    def fold(self, record):
+        totals = self.totals
+        totals['rounds'] += 1
+        totals['solved'] += 1 if record.get('solved') else 0
+        totals['guesses'] += number(record, 'guesses')
+        totals['elapsed'] += number(record, 'elapsed')
+        totals['score'] += number(record, 'score')
+        hints = record.get('hints')
+        for hint in hints if isinstance(hints, list) else []:
+            if str(hint) in totals['hints']:
+                totals['hints'][str(hint)] += 1
+
+# appends one finished round to the log (one write, so lines from several writers never interleave)
+    def record(self, user, word, solved, guesses, elapsed, hints, score):
+        round_record = {'at': int(time.time() * 1000), 'user': user or '', 'word': word, 'solved': bool(solved),
+                        'guesses': guesses, 'elapsed': elapsed, 'hints': list(hints), 'score': score}
+        line = (json.dumps(round_record, separators=(',', ':')) + '\n').encode('utf-8')
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        self.refresh()
+        self.since_snapshot += 1
+        if self.since_snapshot >= self.snapshot_every:
+            self.save_snapshot()
+
+# returns the aggregates over every round in the log
+    def summary(self):
+        self.refresh()
+        totals = self.totals
+        rounds = totals['rounds'] or 1
+        return {'rounds': totals['rounds'], 'solved': totals['solved'], 'solve_rate': totals['solved'] / rounds * 100,
+                'mean_guesses': totals['guesses'] / rounds, 'mean_elapsed': totals['elapsed'] / rounds,
+                'mean_score': totals['score'] / rounds, 'hints': dict(totals['hints'])}
+
+
+# running totals for one user or one word
+class Totals:
+    __slots__ = ('rounds', 'solved', 'guesses', 'elapsed', 'score', 'best')
+
+    def __init__(self):
+        self.rounds = 0
+        self.solved = 0
+        self.guesses = 0
+        self.elapsed = 0.0
+        self.score = 0
+        self.best = 0
+
+    def add(self, record):
+        self.rounds += 1
+        self.solved += 1 if record.get('solved') else 0
+        self.guesses += number(record, 'guesses')
+        self.elapsed += number(record, 'elapsed')
+        score = number(record, 'score')
+        self.score += score
+        if score > self.best:
+            self.best = score
+
+    def to_dict(self):
+        rounds = self.rounds or 1
+        return {'rounds': self.rounds, 'solved': self.solved, 'solve_rate': self.solved / rounds * 100,
+                'mean_guesses': self.guesses / rounds, 'mean_elapsed': self.elapsed / rounds,
+                'total_score': self.score, 'best_score': self.best}
+
+
+class RoundAnalytics:
+    def __init__(self):
+        self.overall = Totals()
+        self.users = {}
+        self.words = {}
+
+    def add(self, record):
+        self.overall.add(record)
+        user = record.get('user') or ''
+        if user:
+            totals = self.users.get(user)
+            if totals is None:
+                totals = self.users[user] = Totals()
+            totals.add(record)
+        word = record.get('word')
+        if isinstance(word, str) and word:
+            totals = self.words.get(word)
+            if totals is None:
+                totals = self.words[word] = Totals()
+            totals.add(record)
+
+    @classmethod
+    def from_paths(cls, paths):
+        analytics = cls()
+        for record in read_rounds(paths):
+            analytics.add(record)
+        return analytics
+
+# users with the highest total score
+    def top_users(self, n=10):
+        return sorted(self.users.items(), key=lambda item: item[1].score, reverse=True)[:n]
+
+# words with the lowest solve rate, among words played at least min_rounds times
+    def hardest_words(self, n=10, min_rounds=5):
+        played = [(word, totals) for word, totals in self.words.items() if totals.rounds >= min_rounds]
+        return sorted(played, key=lambda item: (item[1].solved / item[1].rounds, -item[1].rounds))[:n]
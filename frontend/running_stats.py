@@ -0,0 +1,62 @@
+# Running statistics over a stream of numbers, the Python twin of backendAPI/runningStats.js.
+#
+# Each add() is O(1) and the memory is fixed, however many values have been added. The mean and variance use
+# Welford's update, and the mean of the last `window` values comes from a ring buffer and a running window sum that is
+# recomputed from the ring every time it wraps.
+
+import math
+
+
+class RunningStats:
+    __slots__ = ('window', 'recent', 'next', 'count', 'sum', 'mean', 'm2', 'min', 'max', 'window_sum')
+
+    def __init__(self, window=10):
+        self.window = window
+        self.recent = [0.0] * window
+        self.next = 0
+        self.count = 0
+        self.sum = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.window_sum = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.sum += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        if self.window > 0:
+            self.window_sum += value - self.recent[self.next]
+            self.recent[self.next] = value
+            self.next = (self.next + 1) % self.window
+            if self.next == 0:
+                self.window_sum = math.fsum(self.recent)
+
+# population variance of every value added so far
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+# mean of the last `window` values (fewer until that many have been added)
+    @property
+    def recent_mean(self):
+        size = min(self.count, self.window)
+        return self.window_sum / size if size else 0.0
+
+    def to_dict(self):
+        empty = self.count == 0
+        return {'count': self.count, 'sum': self.sum, 'mean': self.mean, 'variance': self.variance,
+                'stddev': self.stddev, 'min': 0 if empty else self.min, 'max': 0 if empty else self.max,
+                'recent_mean': self.recent_mean, 'window': min(self.count, self.window)}
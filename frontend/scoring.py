@@ -0,0 +1,45 @@
+# Round scoring, the Python side of backendAPI/scoring.js. Both read the rules from backendAPI/scoring.json.
+#
+# The App uses compute_score to predict the score the moment a word is solved. The score that counts is the one the
+# backend computes from its own round clock and hint record (the server, or GameEngine when it runs in-process).
+
+import json
+import os
+
+here = os.path.dirname(os.path.abspath(__file__))
+default_rules_path = os.path.join(here, '..', 'backendAPI', 'scoring.json')
+# setup.py copies scoring.json into the app bundle's Resources folder, py2app points RESOURCEPATH at it
+bundled_rules_path = os.path.join(os.environ.get('RESOURCEPATH', here), 'scoring.json')
+
+# the rules as shipped in scoring.json, used when no scoring.json can be found
+builtin_rules = {
+    'wordPoints': 3,
+    'timeBonuses': [{'under': 5, 'points': 15}, {'under': 10, 'points': 10}, {'under': 15, 'points': 5}],
+    'hintPenalties': {'1': 1, '2': 2, '3': 4},
+}
+
+
+# function to read the scoring rules. Without a path the repo's and the bundle's scoring.json are tried, then the
+# built-in rules are used. A scoring.json that exists but can't be parsed is an error
+def load_rules(path=None):
+    for candidate in [path] if path else [default_rules_path, bundled_rules_path]:
+        try:
+            with open(candidate, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            if path:
+                raise
+    return builtin_rules
+
+
+rules = load_rules()
+# points taken off the score for each hint used
+hint_penalties = {int(hint): penalty for hint, penalty in rules['hintPenalties'].items()}
+
+
+# function to calculate the round score from the word length, solve time (seconds) and the hints used
+def compute_score(word_length, elapsed, hints):
+    word_score = word_length * rules['wordPoints']
+    time_score = next((bonus['points'] for bonus in rules['timeBonuses'] if elapsed < bonus['under']), 0)
+    hint_score = -sum(hint_penalties.get(hint, 0) for hint in {int(hint) for hint in hints})
+    return word_score + time_score + hint_score
@@ -8,7 +8,8 @@ Usage:
 from setuptools import setup
 
 APP = ['main.py']
-DATA_FILES = []
+# scoring rules shared with the server, scoring.py falls back to built-in rules without them
+DATA_FILES = ['../backendAPI/scoring.json']
 OPTIONS = {
     'iconfile': 'appicon.ico'
 }
@@ -0,0 +1,214 @@
+# Headless game simulator and regression benchmark.
+#
+# Plays N rounds through the same GameState the App uses, with a scripted, random or anagram solver, against the in-process
+# engine (default) or a running API server (--url). Reports rounds per second, p50/p95/p99 latency per API call and
+# memory allocation counts, and can write the results as JSON to compare runs.
+#
+# Solvers:
+#   scripted  guesses --misses wrong words, then a dictionary anagram of the scramble (the server only shows the
+#             solution once the round is over)
+#   random    guesses distinct random orderings of the scrambled letters, like a player with no vocabulary
+#   anagram   guesses the dictionary anagrams of the scrambled letters (anagram_index.py), then random orderings
+#
+# Usage:
+#     python simulate.py [--rounds 1000] [--url http://localhost:3000] [--solver scripted|random|anagram] [--letters 4]
+#                        [--misses 2] [--hint-rate 0.2] [--seed 1] [--json results.json]
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from api_client import ApiClient, ApiError
+from engine import GameEngine
+from game_state import GameState, check, correct, incorrect, max_guesses
+from word_index import WordIndex
+
+
+# function to return the p-th percentile of a sorted list
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+# records the latency of every backend call, per endpoint
+class TimedBackend:
+    def __init__(self, backend):
+        self.backend = backend
+        self.latencies = {}
+        self.errors = {}
+
+    def call(self, name, *args):
+        started = time.perf_counter()
+        try:
+            return getattr(self.backend, name)(*args)
+        except ApiError:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            raise
+        finally:
+            self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+
+
+class ScriptedSolver:
+    def __init__(self, rng, misses=2):
+        self.rng = rng
+        self.misses = misses
+        self.index = WordIndex(rng=rng).anagrams
+
+    def start(self, backend, scramble):
+        self.solution = self.index.anagrams(scramble)[0]
+        self.guesses = 0
+
+    def next_guess(self, state):
+        self.guesses += 1
+        if self.guesses > self.misses:
+            return self.solution
+        # a wrong word of the right length, it still gets position data back
+        return self.solution[::-1] if self.solution[::-1] != self.solution else state.word
+
+
+class RandomSolver:
+    def __init__(self, rng, misses=None):
+        self.rng = rng
+
+    def start(self, backend, scramble):
+        self.tried = set()
+
+    def next_guess(self, state):
+        letters = list(state.word)
+        for _ in range(100):
+            self.rng.shuffle(letters)
+            guess = ''.join(letters)
+            if guess not in self.tried:
+                break
+        self.tried.add(guess)
+        return guess
+
+
+class AnagramSolver(RandomSolver):
+    def __init__(self, rng, misses=None):
+        super().__init__(rng)
+        self.index = WordIndex(rng=rng).anagrams
+
+    def start(self, backend, scramble):
+        super().start(backend, scramble)
+        self.candidates = list(self.index.anagrams(scramble))
+
+    def next_guess(self, state):
+        while self.candidates:
+            guess = self.candidates.pop(0)
+            if guess not in self.tried:
+                self.tried.add(guess)
+                return guess
+        return super().next_guess(state)
+
+
+solvers = {'scripted': ScriptedSolver, 'random': RandomSolver, 'anagram': AnagramSolver}
+
+
+# function to play one round through GameState, returns True if it was solved
+def play_round(backend, state, solver, letters, hint_rate, rng):
+    scramble = backend.call('get_word', letters)
+    state.begin_round(scramble)
+    solver.start(backend, scramble)
+    for hint in (1, 2, 3):
+        if rng.random() < hint_rate:
+            state.use_hint(hint)
+            try:
+                backend.call(f'hint{hint}')
+            except ApiError:
+                pass
+    outcome = incorrect
+    while outcome == incorrect and state.guess_number < max_guesses:
+        guess = solver.next_guess(state)
+        if state.submit_guess(guess) != check:
+            break
+        try:
+            response = backend.call('check_word', guess)
+        except ApiError:
+            state.guess_failed()
+            continue
+        outcome = state.guess_checked(response)
+    elapsed = state.end_round()
+    backend.call('finish_round', state.guess_number, elapsed, state.hints_used(), '')
+    return outcome == correct
+
+
+def run(backend, rounds, solver, letters, hint_rate, rng, trace_allocations=True):
+    timed = TimedBackend(backend)
+    state = GameState()
+    timed.call('start_session')
+    solved = 0
+    failed = 0
+
+    gc.collect()
+    collections_before = sum(generation['collections'] for generation in gc.get_stats())
+    blocks_before = sys.getallocatedblocks()
+    if trace_allocations:
+        tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        try:
+            if play_round(timed, state, solver, letters, hint_rate, rng):
+                solved += 1
+        except ApiError:
+            failed += 1
+    seconds = time.perf_counter() - started
+    peak = 0
+    if trace_allocations:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    blocks_after = sys.getallocatedblocks()
+    collections = sum(generation['collections'] for generation in gc.get_stats()) - collections_before
+
+    calls = {}
+    for name, latencies in sorted(timed.latencies.items()):
+        latencies.sort()
+        calls[name] = {'count': len(latencies), 'errors': timed.errors.get(name, 0),
+                       'p50_ms': percentile(latencies, 50) * 1000, 'p95_ms': percentile(latencies, 95) * 1000,
+                       'p99_ms': percentile(latencies, 99) * 1000}
+    return {'rounds': rounds, 'solved': solved, 'failed_rounds': failed, 'seconds': seconds,
+            'rounds_per_second': rounds / seconds if seconds else 0.0, 'calls': calls,
+            'allocations': {'retained_blocks': blocks_after - blocks_before,
+                            'retained_blocks_per_round': (blocks_after - blocks_before) / rounds if rounds else 0.0,
+                            'peak_traced_kib': peak / 1024, 'gc_collections': collections}}
+
+
+def report(results):
+    print(f"rounds: {results['rounds']} in {results['seconds']:.2f} s ({results['rounds_per_second']:.1f} rounds/s), "
+          f"solved: {results['solved']}, failed: {results['failed_rounds']}")
+    for name, call in results['calls'].items():
+        print(f"  {name:<14} {call['count']:>7} calls, {call['errors']} errors, latency ms: p50 {call['p50_ms']:.3f}, "
+              f"p95 {call['p95_ms']:.3f}, p99 {call['p99_ms']:.3f}")
+    allocations = results['allocations']
+    print(f"allocations: {allocations['retained_blocks']} blocks retained ({allocations['retained_blocks_per_round']:.2f} per round), "
+          f"peak traced {allocations['peak_traced_kib']:.0f} KiB, {allocations['gc_collections']} gc collections")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play simulated rounds without the GUI and report throughput and latency.')
+    parser.add_argument('--rounds', type=int, default=1000, help='rounds to play')
+    parser.add_argument('--url', help='API server to play against (default: the in-process engine)')
+    parser.add_argument('--solver', choices=sorted(solvers), default='scripted', help='how guesses are picked')
+    parser.add_argument('--letters', type=int, default=4, help='word length')
+    parser.add_argument('--misses', type=int, default=2, help='wrong guesses before the scripted solver solves the word')
+    parser.add_argument('--hint-rate', type=float, default=0.0, help='chance of using each hint in a round')
+    parser.add_argument('--seed', type=int, default=None, help='random seed for the solver and the engine')
+    parser.add_argument('--no-tracemalloc', action='store_true', help='skip tracemalloc (it slows every allocation)')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    backend = ApiClient(args.url) if args.url else GameEngine(rng=random.Random(args.seed), rounds_path=None)
+    results = run(backend, args.rounds, solvers[args.solver](rng, args.misses), args.letters, args.hint_rate, rng,
+                  trace_allocations=not args.no_tracemalloc)
+    results.update({'backend': args.url or 'local', 'solver': args.solver, 'letters': args.letters})
+    backend.close()
+    report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
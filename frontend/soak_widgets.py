@@ -0,0 +1,52 @@
+# Soak test for the game screen: plays simulated rounds against the in-process engine and checks that widget count
+# and memory stay flat (no new labels or fonts per guess). Needs a display, like the app itself.
+#
+# Usage:
+#     python soak_widgets.py [--rounds 10000] [--report 1000]
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('SCRAMBLE_BACKEND', 'local')
+
+import main
+
+
+# function to play one simulated round: start it, write every guess row, then end it
+def play_round(app, word):
+    app.begin_round(word)
+    for row in range(1, len(app.guess_rows) + 1):
+        app.write_word(word, row)
+    app.end_round()
+    app.update()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check that the game screen does not grow over many rounds.')
+    parser.add_argument('--rounds', type=int, default=10000, help='rounds to play')
+    parser.add_argument('--report', type=int, default=1000, help='rounds between reports')
+    args = parser.parse_args()
+
+    app = main.App()
+    # the backend loads on the worker thread after the first frame
+    deadline = time.perf_counter() + 30
+    while app.prefetcher is None:
+        if time.perf_counter() > deadline:
+            sys.exit('the backend did not load within 30 s')
+        app.update()
+        time.sleep(0.01)
+    tracemalloc.start()
+    started = time.perf_counter()
+    for round_number in range(1, args.rounds + 1):
+        play_round(app, 'soak')
+        if round_number % args.report == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f'round {round_number}: {len(app.game_frame.winfo_children())} widgets, '
+                  f'{len(app.fonts)} fonts, {current / 1024:.0f} KiB traced (peak {peak / 1024:.0f} KiB), '
+                  f'{(time.perf_counter() - started) * 1000 / round_number:.2f} ms/round')
+    app.tasks.shutdown()
+    app.prefetcher.shutdown()
+    app.destroy()
@@ -0,0 +1,163 @@
+# Client telemetry: per-endpoint latency histograms, error counts, bytes transferred and UI stall time.
+#
+# ApiClient records every request and the StallMonitor records every event loop heartbeat. Recording is a
+# bucket increment under a lock, cheap enough for the hot path (requests come from worker threads, heartbeats from the
+# Tk thread). The numbers are shown in the App's hidden Stats tab and can be dumped as JSON or Prometheus text.
+
+import json
+import os
+import threading
+import time
+
+# histogram bucket upper bounds in seconds
+latency_buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+stall_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # the last bucket is everything above the largest bound (+Inf)
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.bounds) and value > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+# upper bound of the bucket holding the p-th percentile, capped at the largest value seen
+    def percentile(self, p):
+        if self.count == 0:
+            return 0.0
+        rank = self.count * p / 100
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {'count': self.count, 'sum': self.total, 'max': self.max,
+                'p50': self.percentile(50), 'p95': self.percentile(95), 'p99': self.percentile(99),
+                'buckets': {str(bound): count for bound, count in zip(self.bounds + ('+Inf',), self.counts)}}
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latency = Histogram(latency_buckets)
+        self.errors = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+
+class Telemetry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.endpoints = {}
+        self.stall = Histogram(stall_buckets)
+
+    def _endpoint(self, endpoint):
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        return stats
+
+# records one finished request (error is a short kind like "timeout" or "status_500", None for a success)
+    def record_request(self, endpoint, seconds, bytes_sent=0, bytes_received=0, error=None):
+        with self.lock:
+            stats = self._endpoint(endpoint)
+            stats.latency.observe(seconds)
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+            if error is not None:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+
+# counts an error found after the request finished (an unreadable response body)
+    def record_error(self, endpoint, error):
+        with self.lock:
+            stats = self._endpoint(endpoint)
+            stats.errors[error] = stats.errors.get(error, 0) + 1
+
+# records how late one event loop heartbeat ran, in seconds
+    def record_stall(self, seconds):
+        with self.lock:
+            self.stall.observe(max(seconds, 0.0))
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'uptime': time.time() - self.started,
+                'endpoints': {endpoint: {'latency': stats.latency.to_dict(), 'errors': dict(stats.errors),
+                                         'bytes_sent': stats.bytes_sent, 'bytes_received': stats.bytes_received}
+                              for endpoint, stats in sorted(self.endpoints.items())},
+                'ui_stall': self.stall.to_dict(),
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+# Prometheus text exposition format
+    def to_prometheus(self):
+        snapshot = self.snapshot()
+        lines = ['# HELP scramble_request_seconds API request latency.', '# TYPE scramble_request_seconds histogram']
+        for endpoint, stats in snapshot['endpoints'].items():
+            lines += histogram_lines('scramble_request_seconds', stats['latency'], f'endpoint="{endpoint}"')
+        lines += ['# HELP scramble_request_errors_total Failed API requests.', '# TYPE scramble_request_errors_total counter']
+        for endpoint, stats in snapshot['endpoints'].items():
+            for error, count in sorted(stats['errors'].items()):
+                lines.append(f'scramble_request_errors_total{{endpoint="{endpoint}",error="{error}"}} {count}')
+        lines += ['# HELP scramble_request_bytes_total Bytes sent and received in request and response bodies.',
+                  '# TYPE scramble_request_bytes_total counter']
+        for endpoint, stats in snapshot['endpoints'].items():
+            lines.append(f'scramble_request_bytes_total{{endpoint="{endpoint}",direction="sent"}} {stats["bytes_sent"]}')
+            lines.append(f'scramble_request_bytes_total{{endpoint="{endpoint}",direction="received"}} {stats["bytes_received"]}')
+        lines += ['# HELP scramble_ui_stall_seconds Delay of the UI event loop heartbeat.', '# TYPE scramble_ui_stall_seconds histogram']
+        lines += histogram_lines('scramble_ui_stall_seconds', snapshot['ui_stall'], '')
+        return '\n'.join(lines) + '\n'
+
+# writes the stats to path, as Prometheus text for a .prom file and JSON otherwise (written whole, then renamed)
+    def dump(self, path):
+        text = self.to_prometheus() if path.endswith('.prom') else self.to_json()
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8', newline='\n') as file:
+            file.write(text)
+        os.replace(temp_path, path)
+
+# short plain text summary for the Stats tab
+    def summary(self):
+        snapshot = self.snapshot()
+        lines = []
+        for endpoint, stats in snapshot['endpoints'].items():
+            latency = stats['latency']
+            errors = sum(stats['errors'].values())
+            lines.append(f'{endpoint}  {latency["count"]} calls, {errors} errors')
+            lines.append(f'  p50 {latency["p50"] * 1000:.0f} ms, p95 {latency["p95"] * 1000:.0f} ms, '
+                         f'max {latency["max"] * 1000:.0f} ms')
+            lines.append(f'  {stats["bytes_sent"]} B sent, {stats["bytes_received"]} B received')
+        stall = snapshot['ui_stall']
+        lines.append(f'UI stall  p95 {stall["p95"] * 1000:.0f} ms, max {stall["max"] * 1000:.0f} ms')
+        return '\n'.join(lines)
+
+
+# function to format one histogram as Prometheus _bucket (cumulative), _sum and _count lines
+def histogram_lines(name, histogram, labels):
+    lines = []
+    cumulative = 0
+    separator = ',' if labels else ''
+    for bound, count in histogram['buckets'].items():
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+    suffix = f'{{{labels}}}' if labels else ''
+    lines.append(f'{name}_sum{suffix} {histogram["sum"]}')
+    lines.append(f'{name}_count{suffix} {histogram["count"]}')
+    return lines
@@ -0,0 +1,83 @@
+# Vectorized guess scoring for analytics, needs NumPy.
+#
+# check_scrambled_word (engine.py) scores one guess against one solution. VectorScorer scores a target against
+# every dictionary word of the same length at once. It is used to rank "near misses" and to calibrate difficulty.
+# The word list is stored as one fixed-width uint8 matrix per length bucket (one row per word, one column per
+# letter). Position masks are then a single broadcast comparison, and the similarity is a row sum. The codes and
+# similarity strings it returns are identical to check_scrambled_word's.
+
+import numpy as np
+
+from word_index import WordIndex
+
+star = ord('*')
+dash = ord('-')
+
+
+# function to encode words of one length as a (words, length) matrix, uint8 unless a letter is outside Latin-1
+def encode(words, length):
+    if all(ord(char) < 256 for word in words for char in word):
+        data = ''.join(words).encode('latin-1')
+        return np.frombuffer(data, dtype=np.uint8).reshape(len(words), length)
+    return np.array([[ord(char) for char in word] for word in words], dtype=np.uint32).reshape(len(words), length)
+
+
+class VectorScorer:
+    def __init__(self, buckets):
+        self.words = {}
+        self.matrices = {}
+        for length, words in buckets.items():
+            # the same word listed twice is scored once
+            words = list(dict.fromkeys(words))
+            self.words[length] = words
+            self.matrices[length] = encode(words, length)
+
+    @classmethod
+    def from_word_index(cls, word_index=None):
+        return cls((word_index or WordIndex()).buckets)
+
+# returns (words, mask, matches) for every dictionary word as long as target: mask[i, j] is True where word i has
+# target's letter at position j, matches[i] is the row's count of those positions
+    def masks(self, target):
+        length = len(target)
+        matrix = self.matrices.get(length)
+        if matrix is None:
+            return [], np.zeros((0, length), dtype=bool), np.zeros(0, dtype=np.int64)
+        # a uint32 row against a uint8 matrix compares the code points, not wrapped bytes
+        mask = matrix == encode([target], length)[0]
+        return self.words[length], mask, mask.sum(axis=1)
+
+# returns the similarity % of every dictionary word as long as target, as floats
+    def similarities(self, target):
+        words, mask, matches = self.masks(target)
+        if not words:
+            return words, np.zeros(0)
+        # same operation order as check_scrambled_word, so the floats are bit for bit the same
+        return words, matches / len(target) * 100
+
+# returns {word: {code, similarity}} for every dictionary word as long as target, each entry equal to
+# check_scrambled_word(word, target)
+    def score(self, target):
+        words, mask, matches = self.masks(target)
+        if not words:
+            return {}
+        length = len(target)
+        codes = np.where(mask, star, dash).astype(np.uint8).tobytes().decode('ascii')
+        similarity = matches / length * 100
+        return {word: {'code': codes[i * length:(i + 1) * length], 'similarity': f'{similarity[i]:.2f}%'}
+                for i, word in enumerate(words)}
+
+# returns the k dictionary words closest to target by matching positions, as (word, similarity %) pairs,
+# best first (ties in word list order). The target itself is left out.
+    def near_misses(self, target, k=10):
+        words, similarity = self.similarities(target)
+        if not words:
+            return []
+        order = np.argsort(-similarity, kind='stable')
+        results = []
+        for i in order:
+            if words[i] != target:
+                results.append((words[i], float(similarity[i])))
+                if len(results) == k:
+                    break
+        return results
@@ -0,0 +1,112 @@
+# Compact binary word list (words.bin), built from words.txt by build_words.py.
+#
+# Layout, all integers little-endian:
+#   header        b'SCRW', version (u32), number of buckets (u32), reserved (u32)
+#   bucket table  one (word length u32, word count u32, byte offset u64) entry per bucket, sorted by length
+#   records       each bucket's words back to back, lowercased, deduplicated and sorted. Every record is exactly
+#                 `word length` bytes, so word i of a bucket starts at offset + i * length
+# Words are ASCII, so byte length and letter count are the same.
+#
+# WordFile memory-maps the file and only reads the header, so opening a list of millions of words takes the same
+# time as opening a small one. Words are sliced out of the map on access, and every process that maps the file
+# shares the same pages. Lookups are a binary search over the sorted bucket.
+
+import bisect
+import mmap
+import os
+import random
+import struct
+from collections.abc import Sequence
+
+default_word_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backendAPI', 'words.bin')
+
+magic = b'SCRW'
+version = 1
+header = struct.Struct('<4sIII')
+bucket_entry = struct.Struct('<IIQ')
+
+
+# function to write a word file from (length -> sorted unique words) buckets, written whole then renamed
+def write_word_file(path, buckets):
+    lengths = sorted(length for length, words in buckets.items() if words)
+    offset = header.size + bucket_entry.size * len(lengths)
+    table = []
+    for length in lengths:
+        table.append(bucket_entry.pack(length, len(buckets[length]), offset))
+        offset += length * len(buckets[length])
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(header.pack(magic, version, len(lengths), 0))
+        file.write(b''.join(table))
+        for length in lengths:
+            file.write(''.join(buckets[length]).encode('ascii'))
+    os.replace(temp_path, path)
+    return offset
+
+
+# the words of one length, a read-only sequence over the mapped records
+class WordBucket(Sequence):
+    def __init__(self, data, length, count, offset):
+        self.data = data
+        self.length = length
+        self.count = count
+        self.offset = offset
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError('word index out of range')
+        start = self.offset + i * self.length
+        return self.data[start:start + self.length].decode('ascii')
+
+    def __contains__(self, word):
+        i = bisect.bisect_left(self, word)
+        return i < self.count and self[i] == word
+
+
+class WordFile:
+    def __init__(self, path=default_word_file_path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        file_magic, file_version, bucket_count, _ = header.unpack_from(self.data, 0)
+        if file_magic != magic or file_version != version:
+            self.data.close()
+            raise ValueError(f'{path} is not a version {version} word file')
+        self.buckets = {}
+        for i in range(bucket_count):
+            length, count, offset = bucket_entry.unpack_from(self.data, header.size + i * bucket_entry.size)
+            self.buckets[length] = WordBucket(self.data, length, count, offset)
+
+    def __len__(self):
+        return sum(bucket.count for bucket in self.buckets.values())
+
+    def __contains__(self, word):
+        bucket = self.buckets.get(len(word))
+        return bucket is not None and word.lower() in bucket
+
+    def lengths(self):
+        return sorted(self.buckets)
+
+# returns a random word of the given length, or None if there are none
+    def random_word(self, length, rng=random):
+        bucket = self.buckets.get(int(length))
+        if not bucket:
+            return None
+        return bucket[rng.randrange(bucket.count)]
+
+    def close(self):
+        self.buckets = {}
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
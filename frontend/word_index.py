@@ -0,0 +1,94 @@
+# In-memory word pool, the Python twin of backendAPI/wordIndex.js.
+#
+# The word file is read once and bucketed by word length so a random word of a given length is picked in O(1).
+# Words are split the same way as the server does (whitespace separated, one or more per line), so the client
+# can pick words offline with the same distribution. The file is re-read when its modification time changes.
+# An anagram index (anagram_index.py) is built with the buckets. Ambiguous words, whose letters spell more than one
+# dictionary word, are skipped when picking a word, unless a length has nothing else.
+# With a target difficulty, words are picked by their rating in word_stats.tsv (word_stats.py) instead of uniformly.
+
+import os
+import random
+import time
+
+from anagram_index import AnagramIndex
+from word_stats import DifficultySampler, default_stats_path, load_word_stats
+
+# the server's word list is the default source
+default_words_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backendAPI', 'words.txt')
+
+
+# function to split the file contents into words and bucket them by length
+def build_buckets(lines):
+    buckets = {}
+    for line in lines:
+        for word in line.split():
+            buckets.setdefault(len(word), []).append(word)
+    return buckets
+
+
+# function to drop the ambiguous words from each bucket, a bucket with only ambiguous words is kept whole
+def build_choices(buckets, anagrams):
+    choices = {}
+    for length, words in buckets.items():
+        unambiguous = [word for word in words if not anagrams.is_ambiguous(word)]
+        choices[length] = unambiguous or words
+    return choices
+
+
+class WordIndex:
+    def __init__(self, path=default_words_path, watch_interval=2.0, rng=None, skip_ambiguous=True,
+                 stats_path=default_stats_path):
+        self.path = path
+        self.stats_path = stats_path
+        self.watch_interval = watch_interval
+        self.rng = rng or random.Random()
+        self.skip_ambiguous = skip_ambiguous
+        self.buckets = {}
+        self.choices = {}
+        self.anagrams = AnagramIndex()
+        self.sampler = None
+        self.mtime = None
+        self.checked = 0.0
+        self.load()
+
+# reads the word file and rebuilds the length buckets, the anagram index and the difficulty sampler
+    def load(self):
+        with open(self.path, 'r', encoding='utf-8') as file:
+            self.mtime = os.fstat(file.fileno()).st_mtime_ns
+            buckets = build_buckets(file)
+        anagrams = AnagramIndex.from_buckets(buckets)
+        self.choices = build_choices(buckets, anagrams) if self.skip_ambiguous else buckets
+        self.sampler = DifficultySampler(self.choices, load_word_stats(self.stats_path))
+        self.anagrams = anagrams
+        self.buckets = buckets
+
+# reloads the buckets if the word file changed, checked at most once every watch_interval seconds
+    def reload_if_changed(self):
+        now = time.monotonic()
+        if now - self.checked < self.watch_interval:
+            return False
+        self.checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self.mtime:
+            return False
+        self.load()
+        return True
+
+# returns all words with the given number of letters
+    def words(self, length):
+        return self.buckets.get(int(length), [])
+
+# returns a random word with the given number of letters, or None if there are none. With a target difficulty
+# (0 easiest to 1 hardest) words rated near the target are picked most often.
+    def random_word(self, length, difficulty=None):
+        self.reload_if_changed()
+        if difficulty is not None:
+            return self.sampler.sample(int(length), difficulty, self.rng)
+        words = self.choices.get(int(length))
+        if not words:
+            return None
+        return words[self.rng.randrange(len(words))]
@@ -0,0 +1,91 @@
+# Per-word difficulty ratings and difficulty-targeted word selection, the Python twin of backendAPI/wordStats.js.
+#
+# word_stats.tsv is built offline by build_word_stats.py. It has one
+# "word<TAB>letter score<TAB>anagrams<TAB>plays<TAB>solves<TAB>guesses<TAB>difficulty" line per word, where
+# difficulty is the word's rank among the words of its length, from 0 (easiest) to 1 (hardest).
+# To pick a word for a target difficulty, each word is weighted by how close its rating is to the target. The
+# weights of a length bucket are summed into a cumulative array once per target level, so a pick is one random
+# number and a binary search, O(log n).
+
+import bisect
+import itertools
+import math
+import os
+
+default_stats_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backendAPI', 'word_stats.tsv')
+
+# named difficulty targets, a number from 0 to 1 is also accepted
+difficulty_levels = {'easy': 0.2, 'medium': 0.5, 'hard': 0.8}
+# how far from the target (in rating) a word still gets picked regularly
+spread = 0.15
+# targets are rounded to this step so each bucket only ever has a few cumulative arrays
+level_step = 0.05
+# rating for words missing from the table (added to words.txt after it was built)
+unrated = 0.5
+
+columns = ('word', 'letter_score', 'anagrams', 'plays', 'solves', 'guesses', 'difficulty')
+
+
+# function to turn a difficulty parameter (a level name or a number from 0 to 1) into a target, None for no target
+def parse_difficulty(value):
+    if value is None or value == '' or value == 'any':
+        return None
+    if isinstance(value, str) and value.lower() in difficulty_levels:
+        return difficulty_levels[value.lower()]
+    try:
+        target = float(value)
+    except (TypeError, ValueError):
+        target = math.nan
+    if not 0 <= target <= 1:
+        raise ValueError('Difficulty must be easy, medium, hard or a number between 0 and 1.')
+    return target
+
+
+# function to read the stats table as a list of row dictionaries
+def read_stats(path=default_stats_path):
+    rows = []
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) != len(columns):
+                continue
+            word, letter_score, anagrams, plays, solves, guesses, difficulty = fields
+            rows.append({'word': word, 'letter_score': float(letter_score), 'anagrams': int(anagrams),
+                         'plays': int(plays), 'solves': int(solves), 'guesses': int(guesses),
+                         'difficulty': float(difficulty)})
+    return rows
+
+
+# function to return {word: difficulty} from the stats table, empty if it has not been built
+def load_word_stats(path=default_stats_path):
+    try:
+        return {row['word']: row['difficulty'] for row in read_stats(path)}
+    except FileNotFoundError:
+        return {}
+
+
+class DifficultySampler:
+    def __init__(self, buckets, ratings):
+        self.buckets = buckets
+        self.ratings = ratings
+        self.cumulative = {}
+
+    def _cumulative(self, length, level):
+        key = (length, round(level, 2))
+        weights = self.cumulative.get(key)
+        if weights is None:
+            weights = [math.exp(-0.5 * ((self.ratings.get(word, unrated) - level) / spread) ** 2) + 1e-9
+                       for word in self.buckets.get(length, [])]
+            weights = self.cumulative[key] = list(itertools.accumulate(weights))
+        return weights
+
+# returns a word of the given length picked around the target difficulty, or None if there are none
+    def sample(self, length, target, rng):
+        words = self.buckets.get(length)
+        if not words:
+            return None
+        # rounded half up like the server's Math.round
+        level = math.floor(target / level_step + 0.5) * level_step
+        cumulative = self._cumulative(length, level)
+        i = bisect.bisect_right(cumulative, rng.random() * cumulative[-1])
+        return words[min(i, len(words) - 1)]